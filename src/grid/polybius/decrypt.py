@@ -14,7 +14,6 @@ import numpy as np
 import pandas as pd
 import random
 import re
-from collections import Counter
 np.seterr(all='raise')
 
 class decrypt:
@@ -55,6 +54,8 @@ class decrypt:
             'P': 1.9, 'B': 1.3, 'V': 1.0, 'K': 0.8, 'J': 0.15, 'X': 0.15,
             'Q': 0.10, 'Z': 0.07
         }
+        # Same frequencies as an A-Z ordered vector for the batched scoring
+        self.freq_vector = np.array([self.lang_freq[chr(i)] for i in range(65, 91)])
         
         # Prepare the character set
         self.prepare_character_set()
@@ -81,6 +82,8 @@ class decrypt:
             chars = [chr(i) for i in range(65, 91)] + [chr(i) for i in range(48, 58)]  # A-Z, 0-9
         
         self.working_chars = chars
+        # set version for the membership checks. working_chars keeps the grid order
+        self.working_set = frozenset(chars)
 
     def create_cipher_grid(self, keyword=None, random_seed=None):
         # Create the grid for the polybius cipher
@@ -149,7 +152,7 @@ class decrypt:
                 elif self.combine_letters == 'UV' and char == 'V':
                     char = 'U'
                 
-                if char in self.working_chars and char not in seen:
+                if char in self.working_set and char not in seen:
                     keyword_chars.append(char)
                     seen.add(char)
         
@@ -167,8 +170,8 @@ class decrypt:
         # If random_seed is None, create alphabetical grid
         if random_seed is not None:
             # Create reproducible random grid
-            random.seed(random_seed)
-            random.shuffle(chars)
+            # (own generator, so the global random module state is left alone)
+            random.Random(random_seed).shuffle(chars)
         # else: keep alphabetical order (chars already in order from prepare_character_set)
         
         return chars
@@ -195,11 +198,8 @@ class decrypt:
 
 
 
-    def decrypt_message(self, encrypted_text, keyword=None, random_seed=None):
-        # attempt to decrypt the emssage using the polybius squrare
-        # Create grid with specified parameters
-        self.create_cipher_grid(keyword, random_seed)
-        
+    def parse_coordinate_pairs(self, encrypted_text):
+        # Split the ciphertext into coordinate pairs and any other characters
         # Split by separator or parse coordinate pairs
         coordinate_pairs = []
         
@@ -218,6 +218,17 @@ class decrypt:
                     coordinate_pairs.append(encrypted_text[i])
                     i += 1
         
+        return coordinate_pairs
+
+
+
+    def decrypt_message(self, encrypted_text, keyword=None, random_seed=None):
+        # attempt to decrypt the emssage using the polybius squrare
+        # Create grid with specified parameters
+        self.create_cipher_grid(keyword, random_seed)
+        
+        coordinate_pairs = self.parse_coordinate_pairs(encrypted_text)
+        
         result = []
         
         for item in coordinate_pairs:
@@ -239,6 +250,63 @@ class decrypt:
 
 
 
+    def create_grid_lut(self, keyword=None, random_seed=None):
+        # Flattened lookup table version of the grid, used by the brute force.
+        # Entry (row * grid_size + col) holds the ordinal of the character in that
+        # cell, or 0 if the cell is empty
+        self.create_cipher_grid(keyword, random_seed)
+        
+        return np.array([ord(char) if char else 0 for row in self.cipher_grid for char in row], dtype=np.uint8)
+
+
+
+    def parse_coordinate_indices(self, encrypted_text):
+        # Parses the ciphertext ONCE for the brute force. Every grid configuration
+        # shares the same coordinates, only the grid contents change.
+        # Returns the pieces of the decrypted text that are the same for every grid,
+        # the positions in that list that get filled in from the grid, and the
+        # flattened grid index (row * grid_size + col) for each of those positions
+        coordinate_pairs = self.parse_coordinate_pairs(encrypted_text)
+        
+        template = []
+        positions = []
+        indices = []
+        
+        for item in coordinate_pairs:
+            if len(item) == 2 and item.isdigit():
+                row = int(item[0]) - self.number_base
+                col = int(item[1]) - self.number_base
+                
+                if 0 <= row < self.grid_size and 0 <= col < self.grid_size:
+                    positions.append(len(template))
+                    indices.append(row * self.grid_size + col)
+                
+                # Mark invalid coordinates (also kept if the grid cell is empty)
+                template.append(f"[{item}]")
+            else:
+                # Non-coordinate (space, punctuation, etc.)
+                template.append(item)
+        
+        return template, positions, np.array(indices, dtype=np.intp)
+
+
+
+    def calculate_english_scores(self, letter_counts):
+        # Batched version of calculate_english_score()
+        # Takes an (N, 26) array of A-Z letter counts, one row per candidate
+        # decryption, and returns the N scores
+        totals = letter_counts.sum(axis=1)
+        observed_freq = letter_counts * (100.0 / np.maximum(totals, 1))[:, None]
+        
+        # Only letters that appear in the text are scored (same as calculate_english_score)
+        diff = np.where(letter_counts > 0, observed_freq - self.freq_vector, 0.0)
+        scores = -(diff * diff).sum(axis=1)
+        scores[totals == 0] = 0
+        
+        return scores
+
+
+
     def calculate_english_score(self, text):
         # Calculate how English-like a text is
         # Remove non-alphabetic characters and convert to uppercase
@@ -247,29 +315,33 @@ class decrypt:
         if len(clean_text) == 0:
             return 0
         
-        # Count letter frequencies
-        letter_counts = Counter(clean_text)
-        total_letters = len(clean_text)
+        # Count letter frequencies. There are only 26 possible letters, so count
+        # each one directly on the ASCII bytes (bytes.count runs in C)
+        letter_bytes = clean_text.encode('ascii')
+        total_letters = len(letter_bytes)
         
         # Calculate score based on how close frequencies are to English
         score = 0
-        for letter, count in letter_counts.items():
-            observed_freq = (count / total_letters) * 100
-            expected_freq = self.lang_freq.get(letter, 0)
-            
-            # Use negative squared difference (closer to expected = higher score)
-            score -= (observed_freq - expected_freq) ** 2
+        for letter, expected_freq in self.lang_freq.items():
+            count = letter_bytes.count(ord(letter))
+            if count:
+                observed_freq = (count / total_letters) * 100
+                
+                # Use negative squared difference (closer to expected = higher score)
+                score -= (observed_freq - expected_freq) ** 2
         
         return score
 
 
-    def brute_force_decrypt(self, encrypted_text, max_keywords=None, show_all=False):
+    def brute_force_decrypt(self, encrypted_text, max_keywords=None, show_all=False, top_n=None, verbose=False):
         # This attempts several strategies for decrypting this cipher
         # First it attempts a brute force (see notes on that function), 
         # and then it tries more analytical methods
         # The brute force is for DEMO purposes only. It is an attack based on some trypical keywords used
         # for learning grid ciphers. 
         # This can cause issues with the test cases doing better than actual encrypted messages.
+        # The header is only printed with verbose (or show_all) so auto_decrypt() stays quiet
+        # until it has results to show.
 
         results = []
         
@@ -309,28 +381,73 @@ class decrypt:
                 'random_seed': None
             })
         
-        print(f"Trying {len(test_configs)} different grid configurations...")
-        print("=" * 80)
-        
+        if verbose or show_all:
+            print(f"Trying {len(test_configs)} different grid configurations...")
+            print("=" * 80)
+        
+        # Build the lookup table for every configuration. The ciphertext is only
+        # parsed once since every configuration shares the same coordinates
+        # (a ciphertext that can't be parsed fails for every configuration)
+        try:
+            template, positions, indices = self.parse_coordinate_indices(encrypted_text)
+        except Exception as e:
+            if show_all:
+                for i, config in enumerate(test_configs):
+                    print(f"{i+1:2d}. {config['name']:<25}: ERROR - {str(e)}")
+            return results
+
+        config_ids = []
+        luts = []
         for i, config in enumerate(test_configs):
             try:
-                decrypted = self.decrypt_message(
-                    encrypted_text, 
-                    config['keyword'], 
-                    config['random_seed']
-                )
-                score = self.calculate_english_score(decrypted)
-                results.append((config['name'], decrypted, score))
-                
-                if show_all:
-                    print(f"{i+1:2d}. {config['name']:<25}: {decrypted[:40]:<40} (Score: {score:.1f})")
-                    
+                luts.append(self.create_grid_lut(config['keyword'], config['random_seed']))
+                config_ids.append(i)
             except Exception as e:
                 if show_all:
                     print(f"{i+1:2d}. {config['name']:<25}: ERROR - {str(e)}")
         
+        if not luts:
+            return results
+        
+        luts = np.stack(luts)  # (configs, grid cells)
+        
+        # Letters outside of the grid lookups are the same for every configuration
+        grid_positions = set(positions)
+        static_text = ''.join(item for pos, item in enumerate(template) if pos not in grid_positions)
+        static_letters = np.frombuffer(re.sub(r'[^A-Z]', '', static_text.upper()).encode('ascii'), dtype=np.uint8)
+        static_counts = np.bincount(static_letters - 65, minlength=26)
+        
+        # Decode and count in one step: count how often each grid cell is used by the
+        # ciphertext, then add those counts to the letter each configuration puts in
+        # that cell. The decrypted text itself is never built for scoring.
+        cell_counts = np.bincount(indices, minlength=self.grid_size * self.grid_size)
+        is_letter = (luts >= 65) & (luts <= 90)
+        rows = np.broadcast_to(np.arange(len(luts))[:, None], luts.shape)
+        letter_counts = np.bincount((rows * 26 + luts.astype(np.intp) - 65)[is_letter],
+                                    weights=np.broadcast_to(cell_counts, luts.shape)[is_letter],
+                                    minlength=len(luts) * 26).reshape(len(luts), 26)
+        scores = self.calculate_english_scores(letter_counts.astype(np.int64) + static_counts)
+        
         # Sort by score (best first)
-        results.sort(key=lambda x: x[2], reverse=True)
+        order = sorted(range(len(luts)), key=lambda k: scores[k], reverse=True)
+        
+        # Only turn the rows that are returned (or shown) back into strings
+        keep = set(order if (show_all or top_n is None) else order[:top_n])
+        decrypted = {}
+        for k in keep:
+            text = template.copy()
+            for pos, code in zip(positions, luts[k][indices]):
+                if code:
+                    text[pos] = chr(code)
+            decrypted[k] = ''.join(text)
+        
+        if show_all:
+            for k, i in enumerate(config_ids):
+                print(f"{i+1:2d}. {test_configs[i]['name']:<25}: {decrypted[k][:40]:<40} (Score: {scores[k]:.1f})")
+        
+        for k in order:
+            if k in keep:
+                results.append((test_configs[config_ids[k]]['name'], decrypted[k], float(scores[k])))
         
         return results
 
@@ -338,7 +455,7 @@ class decrypt:
 
     def auto_decrypt(self, encrypted_text, top_n=5, max_keywords=20):
 
-        results = self.brute_force_decrypt(encrypted_text, max_keywords, show_all=False)
+        results = self.brute_force_decrypt(encrypted_text, max_keywords, show_all=False, top_n=top_n)
         
         print(f"\nTop {top_n} most likely decryptions:")
         print("=" * 80)
@@ -13,8 +13,52 @@
 
 import numpy as np
 import random
+import re
 np.seterr(all='raise')
 
+# Splits concatenated ciphertext: 2 digits at a time, or 1 non-coordinate character
+COORDINATE_PAIR = re.compile(r'\d\d|.', re.DOTALL)
+
+# Grid character sets, keyed by (grid size, combined letters).
+# These never change, so they are only built once when the module loads
+CHARACTER_SETS = {
+    # Traditional: combine I and J
+    (5, 'IJ'): tuple(chr(i) for i in range(65, 73)) + tuple(chr(i) for i in range(75, 91)),  # A-H, K-Z
+    # Alternative: combine U and V
+    (5, 'UV'): tuple(chr(i) for i in range(65, 85)) + tuple(chr(i) for i in range(86, 91)),  # A-T, W-Z
+    # Use first 25 letters
+    (5, None): tuple(chr(i) for i in range(65, 90)),  # A-Y
+    # 6x6 grid can hold 36 characters (A-Z + 0-9)
+    (6, None): tuple(chr(i) for i in range(65, 91)) + tuple(chr(i) for i in range(48, 58)),  # A-Z, 0-9
+}
+
+# Messages at least this long are encrypted through the byte lookup table.
+# Shorter ones are faster with str.translate() (numpy has a fixed setup cost)
+BYTE_TABLE_MIN_LENGTH = 4096
+
+
+class CoordinateTable(dict):
+    # str.translate() table used by encrypt_message(). 
+    # The grid characters are filled in by create_coordinate_map(). Any other character
+    # is worked out the first time it shows up and then cached: unknown letters are
+    # marked as [X], everything else (spaces, punctuation) is kept unchanged.
+    # Every value ends with the separator, encrypt_message() trims the last one.
+
+    def __init__(self, separator):
+        super().__init__()
+        self.separator = separator
+        # Latin-1 covers almost every message, so those 256 entries are built up front.
+        # Grid characters set afterwards replace the placeholders
+        for codepoint in range(256):
+            self.__missing__(codepoint)
+
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        value = (f"[{char}]" if char.isalpha() else char) + self.separator
+        self[codepoint] = value
+        return value
+
+
 class encrypt:
   
     def __init__(self, dictionary, opt_df, parent=None): 
@@ -30,7 +74,11 @@ class encrypt:
             self.original_dictionary = np.array(dictionary)
         
         self.cipher_grid = None
+        self.filled_positions = 0
         self.coordinate_map = None
+        self.coordinate_table = None
+        self.byte_table = None
+        self.byte_table_mask = None
 
         # unpack the dataframe of options configurable to this encryption method
         self.keyword = opt_df['KEYWORD'][0] if 'KEYWORD' in opt_df.columns else None
@@ -40,6 +88,14 @@ class encrypt:
         self.separator = opt_df['SEPARATOR'][0] if 'SEPARATOR' in opt_df.columns else ' '
         self.random_seed = int(opt_df['RANDOM_SEED'][0]) if 'RANDOM_SEED' in opt_df.columns else 42
 
+        # str.translate() table for the combined letters, used on the keyword
+        if self.combine_letters == 'IJ':
+            self.alias_table = str.maketrans({'J': 'I'})
+        elif self.combine_letters == 'UV':
+            self.alias_table = str.maketrans({'V': 'U'})
+        else:
+            self.alias_table = {}
+
         # Validate parameters
         if self.grid_size not in [5, 6]:
             raise ValueError("Grid size must be 5 or 6")
@@ -53,23 +109,21 @@ class encrypt:
         # 36 character set to put in the 6x6 grid
         # 25 set for 5x5
         # Polybius (like ADFGVX) traditionally uses A-Z + 0-9
+        # The sets themselves are built once, see CHARACTER_SETS at the top of the file
         
         if self.grid_size == 5:
             # 5x5 grid needs exactly 25 characters
-            if self.combine_letters == 'IJ':
-                # Traditional: combine I and J
-                chars = [chr(i) for i in range(65, 73)] + [chr(i) for i in range(75, 91)]  # A-H, K-Z
-            elif self.combine_letters == 'UV':
-                # Alternative: combine U and V
-                chars = [chr(i) for i in range(65, 85)] + [chr(i) for i in range(86, 91)]  # A-T, W-Z
+            if self.combine_letters in ('IJ', 'UV'):
+                chars = CHARACTER_SETS[(5, self.combine_letters)]
             else:
-                # Use first 25 letters
-                chars = [chr(i) for i in range(65, 90)]  # A-Y
+                chars = CHARACTER_SETS[(5, None)]
         else:
-            # 6x6 grid can hold 36 characters (A-Z + 0-9)
-            chars = [chr(i) for i in range(65, 91)] + [chr(i) for i in range(48, 58)]  # A-Z, 0-9
+            chars = CHARACTER_SETS[(6, None)]
         
-        self.working_chars = chars
+        # list copy, the grid functions shuffle/copy this
+        self.working_chars = list(chars)
+        # set for membership checks while building the keyword grid
+        self.working_set = frozenset(chars)
 
 
     def create_cipher_grid(self):
@@ -84,18 +138,12 @@ class encrypt:
             grid_chars = self.create_standard_grid()
         
         # Create the grid
-        self.cipher_grid = []
-        chars_per_row = self.grid_size
-        
-        for i in range(self.grid_size):
-            row = []
-            for j in range(chars_per_row):
-                idx = i * chars_per_row + j
-                if idx < len(grid_chars):
-                    row.append(grid_chars[idx])
-                else:
-                    row.append('')  # Empty cell if not enough characters
-            self.cipher_grid.append(row)
+        # Pad with empty cells if there aren't enough characters, then reshape
+        # the flat list into rows in one step. Empty cells are ''
+        grid_cells = self.grid_size * self.grid_size
+        self.filled_positions = min(len(grid_chars), grid_cells)  # for get_grid_stats()
+        grid_chars = list(grid_chars[:grid_cells]) + [''] * (grid_cells - len(grid_chars))
+        self.cipher_grid = np.array(grid_chars, dtype='U1').reshape(self.grid_size, self.grid_size)
         
         # Create coordinate mapping
         self.create_coordinate_map()
@@ -113,26 +161,17 @@ class encrypt:
         if not self.keyword:
             return self.working_chars.copy()
         
-        # Remove duplicates from keyword and convert to uppercase
-        keyword_chars = []
-        seen = set()
-        
-        for char in self.keyword.upper():
-            if char.isalpha() and char not in seen:
-                # Handle combined letters
-                if self.combine_letters == 'IJ' and char == 'J':
-                    char = 'I'
-                elif self.combine_letters == 'UV' and char == 'V':
-                    char = 'U'
-                
-                if char in self.working_chars and char not in seen:
-                    keyword_chars.append(char)
-                    seen.add(char)
+        # Handle combined letters (J -> I, V -> U) and convert to uppercase.
+        # Only letters from the keyword are used, digits are left for the remaining chars
+        keyword_chars = (char for char in self.keyword.upper().translate(self.alias_table)
+                         if char.isalpha() and char in self.working_set)
         
-        # Add remaining characters
-        remaining_chars = [char for char in self.working_chars if char not in seen]
+        # dict keeps the first time each character was added, so this removes duplicates
+        # from the keyword and then adds the remaining characters in order
+        grid_chars = dict.fromkeys(keyword_chars)
+        grid_chars.update(dict.fromkeys(self.working_chars))
         
-        return keyword_chars + remaining_chars
+        return list(grid_chars)
 
 
     def create_standard_grid(self):
@@ -141,8 +180,8 @@ class encrypt:
         
         if self.random_seed is not None:
             # Create reproducible random grid
-            random.seed(self.random_seed)
-            random.shuffle(chars)
+            # (own generator, so the global random module state is left alone)
+            random.Random(self.random_seed).shuffle(chars)
         
         return chars
 
@@ -154,9 +193,8 @@ class encrypt:
         self.coordinate_map = {}
         self.reverse_coordinate_map = {}
         
-        for row in range(self.grid_size):
-            for col in range(self.grid_size):
-                char = self.cipher_grid[row][col]
+        for row, grid_row in enumerate(self.cipher_grid.tolist()):
+            for col, char in enumerate(grid_row):
                 if char:  # Not empty
                     # Coordinates (1-based or 0-based depending on number_base)
                     coord_row = row + self.number_base
@@ -164,74 +202,105 @@ class encrypt:
                     
                     self.coordinate_map[char] = (coord_row, coord_col)
                     self.reverse_coordinate_map[(coord_row, coord_col)] = char
+        
+        # Handle combined letters (J → I, V → U) if the letter isn't in the grid itself.
+        # The alias shares the coordinates, so encryption needs no special case for it
+        if self.combine_letters == 'IJ' and 'J' not in self.coordinate_map and 'I' in self.coordinate_map:
+            self.coordinate_map['J'] = self.coordinate_map['I']
+        elif self.combine_letters == 'UV' and 'V' not in self.coordinate_map and 'U' in self.coordinate_map:
+            self.coordinate_map['V'] = self.coordinate_map['U']
+        
+        # character -> finished coordinate string, e.g. 'A' -> '11'
+        self.encoded_chars = {char: f"{coord_row}{coord_col}" 
+                              for char, (coord_row, coord_col) in self.coordinate_map.items()}
+        
+        # Translation table for encrypt_message(), keyed by character ordinal
+        self.coordinate_table = CoordinateTable(self.separator)
+        for char, encoded in self.encoded_chars.items():
+            self.coordinate_table[ord(char)] = encoded + self.separator
+        
+        # Dense 256-entry version of the same table for long Latin-1 messages.
+        # Row b holds the encoded bytes for byte value b, padded out to the longest
+        # entry, and the mask marks which of those bytes are real.
+        try:
+            # (all 256 are already in the table, nothing new is computed here)
+            entries = [self.coordinate_table[code].encode('latin-1') for code in range(256)]
+        except UnicodeEncodeError:
+            # separator can't be written as single bytes - translate() handles it instead
+            self.byte_table = None
+            self.byte_table_mask = None
+        else:
+            width = max(len(entry) for entry in entries)
+            self.byte_table = np.zeros((256, width), dtype=np.uint8)
+            self.byte_table_mask = np.zeros((256, width), dtype=bool)
+            for code, entry in enumerate(entries):
+                self.byte_table[code, :len(entry)] = np.frombuffer(entry, dtype=np.uint8)
+                self.byte_table_mask[code, :len(entry)] = True
 
 
     def show_cipher_mapping(self, show_coordinates=True):
         # Claude AI tuned up (heavily) to show the square whenever this
         # function is called.
 
-        print(f"Polybius Square ({self.grid_size}x{self.grid_size}):")
+        # The whole display is built as a list of lines and printed once at the end
+        lines = [f"Polybius Square ({self.grid_size}x{self.grid_size}):"]
         
         if self.keyword:
-            print(f"Keyword: '{self.keyword}'")
+            lines.append(f"Keyword: '{self.keyword}'")
         
-        print(f"Combined letters: {self.combine_letters}")
-        print(f"Number base: {self.number_base} ({'1-based' if self.number_base == 1 else '0-based'})")
+        lines.append(f"Combined letters: {self.combine_letters}")
+        lines.append(f"Number base: {self.number_base} ({'1-based' if self.number_base == 1 else '0-based'})")
         
         # Show column headers
-        header = "   "
-        for col in range(self.grid_size):
-            header += f"{col + self.number_base:2d} "
-        print(header)
+        labels = tuple(f"{i + self.number_base:2d}" for i in range(self.grid_size))
+        lines.append("   " + "".join(f"{label} " for label in labels))
         
         # Show grid with row numbers
-        for row in range(self.grid_size):
-            row_str = f"{row + self.number_base:2d} "
-            for col in range(self.grid_size):
-                char = self.cipher_grid[row][col] if self.cipher_grid[row][col] else ' '
-                row_str += f" {char} "
-            print(row_str)
+        for label, grid_row in zip(labels, self.cipher_grid):
+            lines.append(f"{label} " + "".join(f" {char if char else ' '} " for char in grid_row))
         
         if show_coordinates:
-            print(f"\nCoordinate examples:")
+            lines.append(f"\nCoordinate examples:")
             example_chars = ['A', 'E', 'M', 'Z'] if self.grid_size == 5 else ['A', 'E', 'M', 'Z', '5', '9']
-            for char in example_chars:
-                if char in self.coordinate_map:
-                    coord = self.coordinate_map[char]
-                    print(f"  {char} → {coord[0]}{coord[1]}")
+            lines.extend(f"  {char} → {self.encoded_chars[char]}" 
+                         for char in example_chars if char in self.coordinate_map)
+        
+        print('\n'.join(lines))
 
 
 
     def encrypt_message(self, text):
-        if not self.cipher_grid:
+        if self.cipher_grid is None:
             self.create_cipher_grid()
         
-        result = []
-        
-        for char in text.upper():
-            if char in self.coordinate_map:
-                # Character found in grid - replace with coordinates
-                coord = self.coordinate_map[char]
-                coord_str = f"{coord[0]}{coord[1]}"
-                result.append(coord_str)
-            elif char == 'J' and self.combine_letters == 'IJ' and 'I' in self.coordinate_map:
-                # Handle J → I substitution
-                coord = self.coordinate_map['I']
-                coord_str = f"{coord[0]}{coord[1]}"
-                result.append(coord_str)
-            elif char == 'V' and self.combine_letters == 'UV' and 'U' in self.coordinate_map:
-                # Handle V → U substitution
-                coord = self.coordinate_map['U']
-                coord_str = f"{coord[0]}{coord[1]}"
-                result.append(coord_str)
+        # Every character is swapped in one pass:
+        # grid characters become their coordinates, J/V follow the combined letter,
+        # unknown letters are marked and everything else is kept as is.
+        separator = self.separator
+        byte_table = self.byte_table
+        
+        # text that is already upper case doesn't need a second copy
+        upper_text = text if text.isupper() else text.upper()
+        
+        encrypted = None
+        if byte_table is not None and len(upper_text) >= BYTE_TABLE_MIN_LENGTH:
+            try:
+                codes = np.frombuffer(upper_text.encode('latin-1'), dtype=np.uint8)
+            except UnicodeEncodeError:
+                pass  # characters outside Latin-1, use translate() below
             else:
-                # Character not in grid - keep unchanged
-                if char.isalpha():
-                    result.append(f"[{char}]")  # Mark unknown letters
-                else:
-                    result.append(char)  # Keep spaces, punctuation
+                # look up every byte at once and keep only the real (unpadded) bytes
+                encrypted = byte_table[codes][self.byte_table_mask[codes]].tobytes().decode('latin-1')
+        
+        if encrypted is None:
+            encrypted = upper_text.translate(self.coordinate_table)
         
-        return self.separator.join(result)
+        # Each entry ends with the separator, so drop the trailing one.
+        # Only that one - rstrip() would also eat separator characters that
+        # were in the original text (e.g. a message ending in spaces)
+        if separator:
+            encrypted = encrypted[:-len(separator)]
+        return encrypted
 
 
 
@@ -240,54 +309,62 @@ class encrypt:
         # Actual decryption attempts happen in decrypt.py
         # This function has all of the encryption infromation already
 
-        if not self.cipher_grid:
+        if self.cipher_grid is None:
             self.create_cipher_grid()
         
+        separator = self.separator
+        base = self.number_base
+        size = self.grid_size
+        
         # Split by separator
-        if self.separator in encrypted_text:
-            coordinate_pairs = encrypted_text.split(self.separator)
+        if separator in encrypted_text:
+            coordinate_pairs = encrypted_text.split(separator)
         else:
-            # If no separator, assume each coordinate is 2 digits
-            coordinate_pairs = []
-            i = 0
-            while i < len(encrypted_text):
-                if i + 1 < len(encrypted_text) and encrypted_text[i:i+2].isdigit():
-                    coordinate_pairs.append(encrypted_text[i:i+2])
-                    i += 2
-                else:
-                    # Non-coordinate character
-                    coordinate_pairs.append(encrypted_text[i])
-                    i += 1
-        
-        result = []
-        
-        for item in coordinate_pairs:
-            if len(item) == 2 and item.isdigit():
-                # Convert to coordinate
-                row = int(item[0])
-                col = int(item[1])
-                
-                if (row, col) in self.reverse_coordinate_map:
-                    char = self.reverse_coordinate_map[(row, col)]
-                    result.append(char)
-                else:
-                    result.append(f"[{item}]")  # Mark invalid coordinates
+            # If no separator, assume each coordinate is 2 digits.
+            # The compiled regex does the scanning instead of a Python loop
+            coordinate_pairs = COORDINATE_PAIR.findall(encrypted_text)
+        
+        # Non-coordinates (space, punctuation, etc.) pass straight through.
+        # coordinate_pairs is a new list either way, so the decoded characters
+        # are written straight back into it instead of a copy
+        #
+        # Find every 2-digit coordinate pair and decode them all at once
+        pair_positions = [k for k, item in enumerate(coordinate_pairs) if len(item) == 2 and item.isdigit()]
+        
+        if pair_positions:
+            pairs = [coordinate_pairs[k] for k in pair_positions]
+            joined = ''.join(pairs)
+            
+            # ASCII digits are converted as bytes. int() is only needed for other digits
+            if joined.isascii():
+                digits = np.frombuffer(joined.encode('ascii'), dtype=np.uint8).astype(np.intp) - ord('0')
             else:
-                # Non-coordinate (space, punctuation, etc.)
-                result.append(item)
+                digits = np.array([int(d) for d in joined], dtype=np.intp)
+            
+            # Convert to grid positions
+            rows = digits[0::2] - base
+            cols = digits[1::2] - base
+            
+            in_grid = (rows >= 0) & (rows < size) & (cols >= 0) & (cols < size)
+            chars = np.full(len(pairs), '', dtype='U1')
+            chars[in_grid] = self.cipher_grid[rows[in_grid], cols[in_grid]]
+            
+            for k, item, char in zip(pair_positions, pairs, chars.tolist()):
+                # Empty cells and coordinates outside the grid are marked invalid
+                coordinate_pairs[k] = char if char else f"[{item}]"
         
-        return ''.join(result)
+        return ''.join(coordinate_pairs)
 
     def get_grid_stats(self):
         # Pulled form the Claude AI 'Improved' version
         # This is kind of cool to get the metrics for the cipher
-        if not self.cipher_grid:
+        if self.cipher_grid is None:
             return {}
         
         stats = {
             'grid_size': f"{self.grid_size}x{self.grid_size}",
             'total_positions': self.grid_size * self.grid_size,
-            'filled_positions': sum(1 for row in self.cipher_grid for cell in row if cell),
+            'filled_positions': self.filled_positions,
             'keyword_used': bool(self.keyword),
             'combine_letters': self.combine_letters,
             'number_base': self.number_base,
@@ -10,11 +10,169 @@
 #   Last update: June 24, 2025
 ##--------------------------------------------------------------------\
 
-import numpy as np
-import re
+import numpy as np  # used by the brute force batches, long text scoring and analyze_ciphertext()
+from functools import lru_cache
 from collections import Counter
 np.seterr(all='raise')
 
+# Identity permutation the S-box starts from, copied for each new key
+S_TEMPLATE = tuple(range(256))
+
+# Every byte except A-Z, for deleting everything but letters with bytes.translate()
+NON_LETTERS = bytes(b for b in range(256) if not 65 <= b <= 90)
+
+# Text with at least this many letters is scored with numpy arrays. Shorter text (like most
+# brute force attempts) is faster with Counter, numpy has a fixed setup cost
+SCORE_ARRAY_MIN_LENGTH = 1024
+
+# Brute force with at least this many keys runs them all together through
+# rc4_process_batch(). Below that, one rc4_process() call per key is faster
+BATCH_MIN_KEYS = 64
+
+# Common English words, used for a bonus when scoring possible decryptions
+COMMON_WORDS = ('THE', 'AND', 'TO', 'OF', 'A', 'IN', 'IS', 'IT', 'YOU', 'THAT', 
+                'HE', 'WAS', 'FOR', 'ON', 'ARE', 'AS', 'WITH', 'HIS', 'THEY', 'I')
+
+
+def expand_key(key_bytes):
+    # The key repeated (and cut) to exactly 256 bytes, so the KSA can read
+    # expanded_key[i] instead of key_bytes[i % len(key_bytes)] on every step.
+    # This is the temporary vector T from the usual RC4 description
+    return (key_bytes * (256 // len(key_bytes) + 1))[:256]
+
+
+def xor_bytes(data, keystream):
+    # XOR two byte strings of the same length.
+    # As (big) integers, Python does the whole XOR in C a machine word at a time
+    # instead of one byte at a time
+    # (unpacking both into 8 byte words with struct and XORing those in Python
+    # was tried too, it's ~6x slower than this)
+    return (int.from_bytes(data, 'big') ^ int.from_bytes(keystream, 'big')).to_bytes(len(data), 'big')
+
+
+def rc4_process(key_bytes, data):
+    # The full RC4 process in one function: KSA, PRGA and the XOR with the data.
+    # This is the same math as initialize_rc4() + generate_keystream() in the class,
+    # without the step printouts or attribute lookups, so it's the fast version
+    # for when nothing needs to be shown (and for the brute force loop).
+    # Returns the output bytes and the final S-box and pointers: (output, S, i, j)
+
+    expanded_key = expand_key(key_bytes)
+    
+    # (& 0xFF is the same as % 256 for these non-negative values, and a bit cheaper)
+    
+    # KSA
+    S = list(S_TEMPLATE)
+    j = 0
+    for i in range(256):
+        j = (j + S[i] + expanded_key[i]) & 0xFF
+        S[i], S[j] = S[j], S[i]
+    
+    # PRGA, only the keystream bytes are made in the Python loop
+    # (a new buffer each call is fine: allocating it is <1% of the loop below,
+    # and it keeps this function safe to cache and call from anywhere)
+    keystream = bytearray(len(data))
+    i = j = 0
+    for n in range(len(data)):
+        i = (i + 1) & 0xFF
+        j = (j + S[i]) & 0xFF
+        S[i], S[j] = S[j], S[i]
+        keystream[n] = S[(S[i] + S[j]) & 0xFF]
+    
+    # XOR the whole message with the keystream at once
+    return xor_bytes(data, keystream), S, i, j
+
+
+@lru_cache(maxsize=1024)
+def rc4_output_cached(key_bytes, data):
+    # rc4_process() output only, remembered for repeated (key, ciphertext) pairs,
+    # e.g. running the brute force demo on the same ciphertext more than once.
+    # Both arguments have to be bytes (hashable)
+    return rc4_process(key_bytes, data)[0]
+
+
+def rc4_ksa_batch(key_table):
+    # The KSA for many keys at once: numpy does each of the 256 KSA steps for every
+    # key side by side, instead of 256 interpreted steps per key. RC4 can't be
+    # vectorized along the message (every step depends on the last swap), but the
+    # keys are independent of each other.
+    # key_table is a (256, number of keys) uint8 array, each key's bytes repeated out to
+    # 256 (what expand_key() gives) as a column. Shared with klein_demo.py
+    # Returns a (256, number of keys) uint8 array, the S-box for each key as a column.
+    # (Only the 256 steps are a Python loop, so the interpreter cost is per batch, not
+    # per key. That's most of what JIT compiling the per key loop would have bought,
+    # without adding a compiler dependency to these examples)
+    # The S-boxes are stored one column per key so that S[i], which every step reads
+    # for all of the keys, is one contiguous row. The S[j] swaps go through a flat
+    # view with precomputed column offsets instead of 2D fancy indexing
+
+    key_count = key_table.shape[1]
+    columns = np.arange(key_count)
+    
+    S = np.repeat(np.arange(256, dtype=np.uint8), key_count).reshape(256, key_count)
+    S_flat = S.reshape(-1)  # view, S[j, k] is S_flat[j * key_count + k]
+    j = np.zeros(key_count, dtype=np.intp)
+    for i in range(256):
+        old_S_i = S[i].copy()
+        j += old_S_i
+        j += key_table[i]
+        j &= 0xFF
+        
+        # swap S[i] and S[j] for every key
+        flat_j = j * key_count + columns
+        S[i] = S_flat[flat_j]
+        S_flat[flat_j] = old_S_i
+    
+    return S
+
+
+def rc4_keystream_batch(S, length):
+    # The PRGA for every S-box (column) of S at once, the same way as rc4_ksa_batch().
+    # Shared with klein_demo.py.
+    # S is updated in place. Returns a (length, number of keys) uint8 array, one row
+    # per keystream position
+
+    key_count = S.shape[1]
+    columns = np.arange(key_count)
+    S_flat = S.reshape(-1)
+    keystream = np.empty((length, key_count), dtype=np.uint8)
+    
+    # i is the same for every key, j isn't
+    j = np.zeros(key_count, dtype=np.intp)
+    for n in range(length):
+        i = (n + 1) & 0xFF
+        old_S_i = S[i].copy()
+        j += old_S_i
+        j &= 0xFF
+        
+        flat_j = j * key_count + columns
+        old_S_j = S_flat[flat_j]
+        S[i] = old_S_j
+        S_flat[flat_j] = old_S_i
+        
+        # (uint8 addition wraps around at 256, the same as & 0xFF)
+        t = (old_S_i + old_S_j).astype(np.intp)
+        keystream[n] = S_flat[t * key_count + columns]
+    
+    return keystream
+
+
+def rc4_process_batch(key_list, data):
+    # rc4_process() for many keys at once, with rc4_ksa_batch() and rc4_keystream_batch()
+    # doing each step for every key side by side.
+    # Returns a (number of keys, len(data)) uint8 array, one output row per key.
+    # Keys can't be empty (same as rc4_process(), which would divide by 0).
+
+    # Key bytes repeated out to 256, one column per key
+    key_table = np.frombuffer(b''.join(expand_key(key_bytes) for key_bytes in key_list), dtype=np.uint8)
+    key_table = np.ascontiguousarray(key_table.reshape(len(key_list), 256).T)
+    
+    S = rc4_ksa_batch(key_table)
+    keystream = rc4_keystream_batch(S, len(data))
+    
+    return keystream.T ^ np.frombuffer(data, dtype=np.uint8)
+
+
 class decrypt:
   
     def __init__(self, dictionary=None, opt_df=None, parent=None): 
@@ -31,6 +189,9 @@ class decrypt:
         self.key = opt_df['KEY'][0] if 'KEY' in opt_df.columns else 'SECRET'
         self.input_format = opt_df['INPUT_FORMAT'][0] if 'INPUT_FORMAT' in opt_df.columns else 'HEX'
         self.show_steps = opt_df['SHOW_STEPS'][0] if 'SHOW_STEPS' in opt_df.columns else False
+        # Optional: stop the brute force as soon as a key scores above this. 
+        # Off (None) by default, every key is tried
+        self.early_exit_score = opt_df['EARLY_EXIT_SCORE'][0] if 'EARLY_EXIT_SCORE' in opt_df.columns else None
 
         # RC4 internal state (identical to encrypt class)
         self.S = None  # S-box (substitution box)
@@ -46,6 +207,8 @@ class decrypt:
             'P': 1.9, 'B': 1.3, 'V': 1.0, 'K': 0.8, 'J': 0.15, 'X': 0.15,
             'Q': 0.10, 'Z': 0.07
         }
+        # same frequencies as an array in A-Z order, for scoring
+        self.freq_vector = np.array([self.lang_freq[chr(i)] for i in range(65, 91)])
 
         # This method includes a brute force attempt with some common test keys.
         # This is for demo purposes only. Some of them could be 'default', but these are
@@ -57,6 +220,20 @@ class decrypt:
             'A', 'B', 'C', 'X', 'Y', 'Z',  # Single characters (less typical)
         ]
 
+        # Add some systematic variations. The list doesn't change, so it's
+        # put together once here instead of on every brute_force_decrypt() call
+        extended_keys = []
+        for key in self.brute_force_keys[:10]:  # Don't make it too long
+            extended_keys.extend([
+                key.lower(),
+                key + '1',
+                key + '123',
+                '1' + key,
+            ])
+        
+        self.all_keys = self.brute_force_keys + extended_keys
+        self.all_key_bytes = [self.prepare_key(key) for key in self.all_keys]
+
 
     def prepare_key(self, key_string):
         # Convert the string to BYTES
@@ -74,7 +251,9 @@ class decrypt:
 
         if self.input_format == 'HEX':
             # Remove spaces and convert from hex
-            clean_hex = re.sub(r'\s+', '', ciphertext_string)
+            # (split() with no arguments splits on the same whitespace as the regex \s,
+            # and skips the regex engine)
+            clean_hex = ''.join(ciphertext_string.split())
             try:
                 return bytes.fromhex(clean_hex)
             except ValueError:
@@ -126,22 +305,31 @@ class decrypt:
             print(f"Key length: {len(key_bytes)} bytes")
         
         # Step 1: Initialize S-box with identity permutation
-        self.S = list(range(256))
+        self.S = list(S_TEMPLATE)
         
         if self.show_steps:
             print(f"Initial S-box: [0, 1, 2, ..., 255]")
         
         # Step 2: Use key to scramble S-box
+        # The first few iterations are printed when showing steps. They're split off
+        # into their own loop so the rest don't check show_steps every time
+        S = self.S
+        expanded_key = expand_key(key_bytes)
+        shown = 8 if self.show_steps else 0
+        
         j = 0
-        for i in range(256):
-            j = (j + self.S[i] + key_bytes[i % len(key_bytes)]) % 256
+        for i in range(shown):  # Show first few iterations
+            j = (j + S[i] + expanded_key[i]) & 0xFF
+            S[i], S[j] = S[j], S[i]
             
-            # Swap S[i] and S[j]
-            self.S[i], self.S[j] = self.S[j], self.S[i]
+            key_byte = expanded_key[i]
+            print(f"i={i:3d}: j=({j-key_byte}+{S[j]}+{key_byte})%256={j:3d}, swap S[{i}]↔S[{j}]")
+        
+        for i in range(shown, 256):
+            j = (j + S[i] + expanded_key[i]) & 0xFF
             
-            if self.show_steps and i < 8:  # Show first few iterations
-                key_byte = key_bytes[i % len(key_bytes)]
-                print(f"i={i:3d}: j=({j-key_byte}+{self.S[j]}+{key_byte})%256={j:3d}, swap S[{i}]↔S[{j}]")
+            # Swap S[i] and S[j]
+            S[i], S[j] = S[j], S[i]
         
         if self.show_steps:
             print(f"Final S-box first 16 values: {self.S[:16]}")
@@ -167,16 +355,16 @@ class decrypt:
             raise ValueError("RC4 not initialized - call initialize_rc4() first")
         
         # Increment i
-        self.i = (self.i + 1) % 256
+        self.i = (self.i + 1) & 0xFF
         
         # Update j
-        self.j = (self.j + self.S[self.i]) % 256
+        self.j = (self.j + self.S[self.i]) & 0xFF
         
         # Swap S[i] and S[j]
         self.S[self.i], self.S[self.j] = self.S[self.j], self.S[self.i]
         
         # Generate keystream byte
-        keystream_byte = self.S[(self.S[self.i] + self.S[self.j]) % 256]
+        keystream_byte = self.S[(self.S[self.i] + self.S[self.j]) & 0xFF]
         
         return keystream_byte
     
@@ -191,7 +379,7 @@ class decrypt:
         if not self.initialized:
             self.initialize_rc4()
         
-        keystream = []
+        keystream = bytearray(length)  # filled in below, one byte per step
         
         if self.show_steps:
             print(f"\n=== RC4 Pseudo-Random Generation Algorithm (PRGA) for Decryption ===")
@@ -199,15 +387,31 @@ class decrypt:
             print("Step | i   | j   | S[i] | S[j] | S[i]+S[j] | S[sum] | Keystream")
             print("-" * 65)
         
-        for step in range(length):
-            old_i, old_j = self.i, self.j
-            
-            keystream_byte = self.generate_keystream_byte()
-            keystream.append(keystream_byte)
+        # Same steps as generate_keystream_byte(), but run in this loop with the
+        # S-box and pointers held in local variables instead of a method call per byte.
+        # Printed steps get their own loop, like in initialize_rc4()
+        S = self.S
+        i, j = self.i, self.j
+        shown = min(length, 10) if self.show_steps else 0
+        
+        for step in range(shown):  # Show first 10 steps
+            i = (i + 1) & 0xFF
+            j = (j + S[i]) & 0xFF
+            S[i], S[j] = S[j], S[i]
+            keystream_byte = S[(S[i] + S[j]) & 0xFF]
+            keystream[step] = keystream_byte
             
-            if self.show_steps and step < 10:  # Show first 10 steps
-                sum_indices = (self.S[self.i] + self.S[self.j]) % 256
-                print(f"{step:4d} | {self.i:3d} | {self.j:3d} | {self.S[self.i]:3d}  | {self.S[self.j]:3d}  | {sum_indices:8d} | {keystream_byte:3d}    | 0x{keystream_byte:02X}")
+            sum_indices = (S[i] + S[j]) & 0xFF
+            print(f"{step:4d} | {i:3d} | {j:3d} | {S[i]:3d}  | {S[j]:3d}  | {sum_indices:8d} | {keystream_byte:3d}    | 0x{keystream_byte:02X}")
+        
+        for step in range(shown, length):
+            i = (i + 1) & 0xFF
+            j = (j + S[i]) & 0xFF
+            S[i], S[j] = S[j], S[i]
+            keystream[step] = S[(S[i] + S[j]) & 0xFF]
+        
+        # save the pointers so the stream can be continued
+        self.i, self.j = i, j
         
         if self.show_steps and length > 10:
             print(f"... (generated {length - 10} more bytes)")
@@ -226,25 +430,29 @@ class decrypt:
         # Parse ciphertext from input format
         ciphertext_bytes = self.parse_ciphertext(ciphertext)
         
-        if self.show_steps:
+        if not self.show_steps:
+            # Nothing to print, so KSA, PRGA and XOR run together in rc4_process().
+            # The final S-box and pointers are kept, same as the step-by-step version
+            plaintext_bytes, self.S, self.i, self.j = rc4_process(self.prepare_key(actual_key), ciphertext_bytes)
+            self.initialized = True
+        
+        else:
             print(f"\n=== RC4 Decryption Process ===")
             print(f"Ciphertext: '{ciphertext}'")
             print(f"Ciphertext bytes: {ciphertext_bytes.hex().upper()}")
             print(f"Length: {len(ciphertext_bytes)} bytes")
-        
-        # Initialize RC4 with the key (creates identical keystream as encryption)
-        self.initialize_rc4(actual_key)
-        
-        # Generate keystream (identical to what was used for encryption)
-        keystream = self.generate_keystream(len(ciphertext_bytes))
-        
-        if self.show_steps:
+            
+            # Initialize RC4 with the key (creates identical keystream as encryption)
+            self.initialize_rc4(actual_key)
+            
+            # Generate keystream (identical to what was used for encryption)
+            keystream = self.generate_keystream(len(ciphertext_bytes))
+            
             print(f"\nKeystream: {keystream.hex().upper()}")
-        
-        # XOR ciphertext with keystream (identical operation)
-        plaintext_bytes = bytes(c ^ k for c, k in zip(ciphertext_bytes, keystream))
-        
-        if self.show_steps:
+            
+            # XOR ciphertext with keystream (identical operation)
+            plaintext_bytes = xor_bytes(ciphertext_bytes, keystream)
+            
             print(f"\n=== XOR Operation (Decryption) ===")
             print("Pos | Cipher | Key | Plain")
             print("-" * 26)
@@ -257,7 +465,14 @@ class decrypt:
             
             print(f"\nPlaintext bytes: {plaintext_bytes.hex().upper()}")
         
+        return self.format_plaintext(plaintext_bytes)
+
+
+    def format_plaintext(self, plaintext_bytes):
         # Try to decode as UTF-8 text
+        # NOTE: most brute force keys give bytes that aren't UTF-8, so this usually ends in the
+        # except. That's still kept: the hex string is what gets scored and shown for those keys.
+        # The failed decode stops at the first bad byte and costs ~1us, vs. ~30us for the RC4 itself
         try:
             return plaintext_bytes.decode('utf-8')
         except UnicodeDecodeError:
@@ -272,71 +487,119 @@ class decrypt:
         if not isinstance(text, str):
             return -1000  # Penalize non-text results
         
-        # Remove non-alphabetic characters and convert to uppercase
-        clean_text = re.sub(r'[^A-Za-z]', '', text.upper())
+        # Remove non-alphabetic characters and convert to uppercase.
+        # Done on bytes with a delete table instead of a regex: non-ASCII characters are
+        # dropped by the encode, everything else but A-Z by translate()
+        # (upper() leaves no a-z behind)
+        upper_text = text.upper()
+        clean_text = upper_text.encode('ascii', 'ignore').translate(None, NON_LETTERS)
+        total_letters = len(clean_text)
         
-        if len(clean_text) == 0:
+        if total_letters == 0:
             return -1000
         
-        # Count letter frequencies
-        letter_counts = Counter(clean_text)
-        total_letters = len(clean_text)
+        if total_letters < SCORE_ARRAY_MIN_LENGTH:
+            # Count letter frequencies, then compare to the expected English frequencies
+            letter_counts = Counter(clean_text)
+            differences = [((count / total_letters) * 100 - self.lang_freq.get(chr(letter), 0)) ** 2
+                           for letter, count in letter_counts.items()]
+        
+        else:
+            # Same thing with numpy arrays for long text
+            letter_codes = np.frombuffer(clean_text, dtype=np.uint8)
+            
+            # Letters are put in the order they first appear (like Counter above),
+            # so the score adds up in the same order and matches to the last bit
+            letters, first_seen, letter_counts = np.unique(letter_codes, return_index=True, return_counts=True)
+            order = np.argsort(first_seen)
+            
+            observed_freq = (letter_counts[order] / total_letters) * 100
+            expected_freq = self.freq_vector[letters[order] - 65]
+            # (squared as Python floats: x ** 2 on an array is x * x, which can be 1 bit off pow())
+            differences = [difference ** 2 for difference in (observed_freq - expected_freq).tolist()]
         
         # Calculate score based on closeness to English frequencies
+        # Use negative squared difference (closer to expected = higher score)
         score = 0
-        for letter, count in letter_counts.items():
-            observed_freq = (count / total_letters) * 100
-            expected_freq = self.lang_freq.get(letter, 0)
-            
-            # Use negative squared difference (closer to expected = higher score)
-            score -= (observed_freq - expected_freq) ** 2
+        for difference in differences:
+            score -= difference
         
         # Bonus for common English words
-        common_words = ['THE', 'AND', 'TO', 'OF', 'A', 'IN', 'IS', 'IT', 'YOU', 'THAT', 'HE', 'WAS', 'FOR', 'ON', 'ARE', 'AS', 'WITH', 'HIS', 'THEY', 'I']
-        word_bonus = sum(10 for word in common_words if word in text.upper())
+        word_bonus = sum(10 for word in COMMON_WORDS if word in upper_text)
         score += word_bonus
         
         return score
 
-    def brute_force_decrypt(self, ciphertext, max_keys=None, show_all=False):
+    def brute_force_decrypt(self, ciphertext, max_keys=None, show_all=False, key_list=None):
         # NOTE: the 'keys' included in this function include 
         # a very specific dictionary tied to the use cases. 
-        # The dictionary can be changed at the top of the class
+        # The dictionary can be changed at the top of the class,
+        # or a different list of keys (e.g. a larger wordlist) passed in as key_list
 
         results = []
-               
-        # Add some systematic variations
-        extended_keys = []
-        for key in self.brute_force_keys[:10]:  # Don't make it too long
-            extended_keys.extend([
-                key.lower(),
-                key + '1',
-                key + '123',
-                '1' + key,
-            ])
         
-        all_keys = self.brute_force_keys + extended_keys
+        # The key list (with its variations) and the key bytes are built in __init__
+        if key_list is None:
+            all_keys = self.all_keys
+            all_key_bytes = self.all_key_bytes
+        else:
+            all_keys = list(key_list)
+            all_key_bytes = [self.prepare_key(key) for key in all_keys]
         
         if max_keys:
             all_keys = all_keys[:max_keys]
+            all_key_bytes = all_key_bytes[:max_keys]
         
         print(f"Trying {len(all_keys)} different keys...")
         print("=" * 60)
         
-        for i, key in enumerate(all_keys):
+        # The ciphertext is the same for every key, so it's only parsed once here.
+        # If it can't be parsed, every attempt reports that error (same as before)
+        try:
+            ciphertext_bytes = self.parse_ciphertext(ciphertext)
+            parse_error = None
+        except Exception as e:
+            parse_error = e
+        
+        # With enough keys, decrypt with all of them at once
+        # (unless the brute force might stop early, then one at a time wastes less).
+        # Only when every key is non-empty bytes, otherwise one bad key would stop the
+        # whole batch. One at a time, the bad key is reported and the rest still run
+        batch_output = None
+        if (parse_error is None and len(all_key_bytes) >= BATCH_MIN_KEYS and self.early_exit_score is None
+                and isinstance(ciphertext_bytes, bytes)
+                and all(isinstance(key_bytes, bytes) and key_bytes for key_bytes in all_key_bytes)):
+            batch_output = rc4_process_batch(all_key_bytes, ciphertext_bytes)
+        
+        for i, (key, key_bytes) in enumerate(zip(all_keys, all_key_bytes)):
             try:
-                # Reset RC4 state for each attempt
-                self.initialized = False
-                decrypted = self.decrypt_message(ciphertext, key)
+                if parse_error is not None:
+                    raise parse_error
+                
+                # skip decrypt_message() and go straight to the RC4 process
+                # (no step by step printout for every key, even with show_steps on)
+                if batch_output is not None:
+                    plaintext_bytes = batch_output[i].tobytes()
+                elif isinstance(ciphertext_bytes, bytes) and isinstance(key_bytes, bytes):
+                    plaintext_bytes = rc4_output_cached(key_bytes, ciphertext_bytes)
+                else:
+                    plaintext_bytes = rc4_process(key_bytes, ciphertext_bytes)[0]
+                decrypted = self.format_plaintext(plaintext_bytes)
                 score = self.calculate_english_score(decrypted)
                 results.append((key, decrypted, score))
                 
                 if show_all:
-                    print(f"{i+1:3d}. Key '{key:12s}' → {decrypted[:30]:<30} (Score: {score:.1f})")
+                    print(f"{i+1:3d}. Key '{key!s:12}' → {decrypted[:30]:<30} (Score: {score:.1f})")
+                
+                # Good enough, don't try the rest of the keys
+                # (the keys are ordered with the most likely ones first)
+                if self.early_exit_score is not None and score > self.early_exit_score:
+                    print(f"Key '{key}' scored {score:.1f} (above {self.early_exit_score}), stopping early")
+                    break
                     
             except Exception as e:
                 if show_all:
-                    print(f"{i+1:3d}. Key '{key:12s}' → ERROR: {str(e)}")
+                    print(f"{i+1:3d}. Key '{key!s:12}' → ERROR: {str(e)}")
         
         # Sort by score (best first)
         results.sort(key=lambda x: x[2], reverse=True)
@@ -345,16 +608,24 @@ class decrypt:
 
 
 
-    def auto_decrypt(self, ciphertext, top_n=5, max_keys=30):
+    def clear_cache(self):
+        # forget the brute force results saved by rc4_output_cached()
+        # (the cache is shared by every decrypt instance)
+        rc4_output_cached.cache_clear()
+
+
+    def auto_decrypt(self, ciphertext, top_n=5, max_keys=30, key_list=None):
        # automatically find the most likely decryption
        # (results may vary)
-        results = self.brute_force_decrypt(ciphertext, max_keys, show_all=False)
+       # A long key_list is where the batch path in brute_force_decrypt() pays off,
+       # every key is run through RC4 side by side
+        results = self.brute_force_decrypt(ciphertext, max_keys, show_all=False, key_list=key_list)
         
         print(f"\nTop {top_n} most likely decryptions:")
         print("=" * 70)
         
         for i, (key, decrypted, score) in enumerate(results[:top_n]):
-            print(f"{i+1}. Key '{key:12s}' (Score: {score:6.1f}): {decrypted}")
+            print(f"{i+1}. Key '{key!s:12}' (Score: {score:6.1f}): {decrypted}")
         
         return results[0][1] if results else "No valid decryption found"
 
@@ -377,17 +648,18 @@ class decrypt:
         
         plaintext_bytes = plaintext.encode('utf-8')
         self.initialize_rc4(key)
-        keystream1 = self.generate_keystream(len(plaintext_bytes))
-        ciphertext_bytes = bytes(p ^ k for p, k in zip(plaintext_bytes, keystream1))
+        keystream = self.generate_keystream(len(plaintext_bytes))
+        ciphertext_bytes = xor_bytes(plaintext_bytes, keystream)
         ciphertext_hex = ciphertext_bytes.hex().upper()
         
         print(f"Ciphertext: {ciphertext_hex}")
         
-        # Step 2: "Decrypt" (generate same keystream and XOR again)
+        # Step 2: "Decrypt" (XOR again with the same keystream)
+        # The same key always gives the same keystream, so instead of running the
+        # KSA and PRGA a second time, the keystream from step 1 is reused
         print(f"\n--- Step 2: Decryption ---")
-        self.initialize_rc4(key)  # Reset RC4 state
-        keystream2 = self.generate_keystream(len(ciphertext_bytes))
-        decrypted_bytes = bytes(c ^ k for c, k in zip(ciphertext_bytes, keystream2))
+        print(f"Same key -> same keystream, XOR the ciphertext with the step 1 keystream")
+        decrypted_bytes = xor_bytes(ciphertext_bytes, keystream)
         decrypted_text = decrypted_bytes.decode('utf-8')
         
         self.show_steps = old_show_steps
@@ -396,9 +668,7 @@ class decrypt:
         
         # Verify
         print(f"\n--- Verification ---")
-        print(f"Keystream 1: {keystream1.hex().upper()}")
-        print(f"Keystream 2: {keystream2.hex().upper()}")
-        print(f"Keystreams identical: {keystream1 == keystream2}")
+        print(f"Keystream: {keystream.hex().upper()}")
         print(f"Decryption successful: {plaintext == decrypted_text}")
         
         return decrypted_text
@@ -418,16 +688,19 @@ class decrypt:
             print(f"Length: {len(ciphertext_bytes)} bytes")
             
             # Byte frequency analysis
-            byte_counts = Counter(ciphertext_bytes)
-            print(f"Unique bytes: {len(byte_counts)}/256 possible")
+            byte_values, first_seen, byte_counts = np.unique(np.frombuffer(ciphertext_bytes, dtype=np.uint8), 
+                                                             return_index=True, return_counts=True)
+            print(f"Unique bytes: {len(byte_values)}/256 possible")
             
-            # Most common bytes
-            most_common = byte_counts.most_common(5)
+            # Most common bytes (ties in the order they first appear)
+            top = np.lexsort((first_seen, -byte_counts))[:5]
+            most_common = zip(byte_values[top].tolist(), byte_counts[top].tolist())
             print(f"Most frequent bytes: {[(f'0x{b:02X}', c) for b, c in most_common]}")
             
             # Entropy estimate (simplified)
             total_bytes = len(ciphertext_bytes)
-            entropy = -sum((count/total_bytes) * np.log2(count/total_bytes) for count in byte_counts.values())
+            probabilities = byte_counts / total_bytes
+            entropy = -float(np.sum(probabilities * np.log2(probabilities))) if total_bytes else 0
             print(f"Approximate entropy: {entropy:.2f} bits/byte (max 8.0 for random)")
             
             # Compare entropy
@@ -195,15 +195,11 @@ else:
     common_keys = ['SECRET', 'KEY', 'PASSWORD', 'TEST', 'HELLO', 'ABC', '123']
     print("Trying common keys:")
     
+    # brute_cipher is reused for every key. decrypt_message() re-runs the KSA
+    # for the key it's given, so there's no need for a new instance (and DataFrame) each time
     for test_key in common_keys:
         try:
-            test_options = pd.DataFrame({
-                'KEY': [test_key],
-                'INPUT_FORMAT': ['HEX'],
-                'SHOW_STEPS': [False]
-            })
-            test_cipher = decrypt(None, test_options)
-            result = test_cipher.decrypt_message(sample_ciphertext)
+            result = brute_cipher.decrypt_message(sample_ciphertext, test_key)
             
             print(f"  Key '{test_key}': '{result}'", end="")
             if result == sample_case['plaintext']:
@@ -11,9 +11,139 @@
 ##--------------------------------------------------------------------\
 
 import numpy as np
+from functools import lru_cache
+from dataclasses import dataclass
+
+# expand_key() and xor_bytes() are shared with the decrypt class
+from decrypt import expand_key, xor_bytes
 
 np.seterr(all='raise')
 
+# With CACHE_RESULTS on, messages up to this many bytes have their quiet path result
+# saved (per instance) for up to CACHE_MAX_ENTRIES (key, message) pairs.
+# Longer ones aren't cached, so the cache can't grow huge
+CACHE_MAX_LENGTH = 4096
+CACHE_MAX_ENTRIES = 1024
+
+# 8-bit binary string for every byte value, looked up by format_output() for BINARY
+BINARY_STRINGS = tuple(f'{b:08b}' for b in range(256))
+
+
+@lru_cache(maxsize=64)
+def encode_key(key_string):
+    # UTF-8 bytes of a key string, remembered so a key used over and over
+    # (every encrypt_message() and get_cipher_stats() call) is only encoded once
+    return key_string.encode('utf-8')
+
+
+def rc4_ksa(key_bytes):
+    # KSA on its own, without the step printouts in initialize_rc4().
+    # Returns the scrambled S-box as a list
+    # (a bytearray would be smaller, but list indexing is the faster of the
+    # two in these loops, so the working S-box stays a list. Only the cached
+    # copy in the class is kept as 256 raw bytes)
+    expanded_key = expand_key(key_bytes)
+    S = list(range(256))
+    j = 0
+    for i in range(256):
+        j = (j + S[i] + expanded_key[i]) & 0xFF
+        S[i], S[j] = S[j], S[i]
+    return S
+
+
+def rc4_prga_xor(S, i, j, data, output=None):
+    # PRGA + XOR for a whole message, starting from the S-box and pointers given.
+    # S is updated in place (like the class state), and the new pointers are
+    # returned with the output: (output, i, j)
+    # output can be a bytearray (at least as long as data) to write into instead
+    # of allocating a new one, e.g. reused across calls
+    # Each keystream byte is XORed with the data as soon as it's made, so there's
+    # one pass over the message and no separate keystream buffer
+    # (This loop is the only hot spot. A compiled version, e.g. a small C function
+    # rc4_xor(S, &i, &j, data, out, n) loaded through cffi, could replace this
+    # function as-is. These examples stay pure Python + numpy so they run anywhere
+    # without a build step. Cache tuning like aligning the 256 byte S-box or
+    # prefetching S[i] would only matter in that compiled version, here the
+    # interpreter overhead per byte is far larger than any cache miss)
+    if output is None:
+        output = bytearray(len(data))
+    for n in range(len(data)):
+        i = (i + 1) & 0xFF
+        j = (j + S[i]) & 0xFF
+        S[i], S[j] = S[j], S[i]
+        output[n] = data[n] ^ S[(S[i] + S[j]) & 0xFF]
+
+    return bytes(memoryview(output)[:len(data)]), i, j
+
+
+def rc4_encrypt_result(key_bytes, data):
+    # KSA + PRGA + XOR from scratch, the function the CACHE_RESULTS option remembers
+    # for repeated (key, message) pairs, like retrying the same text with the same key.
+    # Both arguments have to be bytes (hashable).
+    # Returns (output, S, i, j) with the final S-box as bytes, so a cached
+    # copy can't be changed by whoever uses it
+    S = rc4_ksa(key_bytes)
+    output, i, j = rc4_prga_xor(S, 0, 0, data)
+    return output, bytes(S), i, j
+
+
+def ct_lookup(S, index):
+    # S[index], but reading every entry of the S-box and masking out all but the
+    # one wanted, so which memory gets touched doesn't depend on index.
+    # mask is 0xFF only when k == index, 0 otherwise
+    value = 0
+    for k in range(256):
+        mask = -(k == index) & 0xFF
+        value |= S[k] & mask
+    return value
+
+
+def rc4_prga_xor_constant_time(S, i, j, data, output=None):
+    # rc4_prga_xor() with every S-box read and the swap done without indexing
+    # by a secret value (j and the output index depend on the key).
+    # Plain RC4 lookups can leak those values through the CPU cache, this version
+    # trades ~256 steps per byte for an access pattern that's the same every time.
+    # This is for DEMO purposes, Python itself makes no timing guarantees
+    if output is None:
+        output = bytearray(len(data))
+    for n in range(len(data)):
+        i = (i + 1) & 0xFF
+        S_i = ct_lookup(S, i)
+        j = (j + S_i) & 0xFF
+        S_j = ct_lookup(S, j)
+
+        # swap S[i] and S[j] by rewriting every entry
+        for k in range(256):
+            mask_i = -(k == i) & 0xFF
+            mask_j = -(k == j) & 0xFF
+            S[k] = (S[k] & ~(mask_i | mask_j) & 0xFF) | (S_j & mask_i) | (S_i & mask_j)
+
+        output[n] = data[n] ^ ct_lookup(S, (S_i + S_j) & 0xFF)
+
+    return bytes(memoryview(output)[:len(data)]), i, j
+
+
+@dataclass
+class RC4Options:
+    # The same options as the 1 row DataFrame, as a plain object.
+    # Building and indexing a DataFrame costs far more than the encryption of a
+    # short message, so code that makes a lot of cipher instances can pass this instead
+    key: str = 'SECRET'
+    output_format: str = 'HEX'
+    show_steps: bool = False
+    side_channel_safe: bool = False
+    cache_results: bool = False
+
+    @classmethod
+    def from_dataframe(cls, opt_df):
+        return cls(
+            key=opt_df['KEY'][0] if 'KEY' in opt_df.columns else 'SECRET',
+            output_format=opt_df['OUTPUT_FORMAT'][0] if 'OUTPUT_FORMAT' in opt_df.columns else 'HEX',
+            show_steps=opt_df['SHOW_STEPS'][0] if 'SHOW_STEPS' in opt_df.columns else False, #bool
+            side_channel_safe=opt_df['SIDE_CHANNEL_SAFE'][0] if 'SIDE_CHANNEL_SAFE' in opt_df.columns else False, #bool
+            cache_results=opt_df['CACHE_RESULTS'][0] if 'CACHE_RESULTS' in opt_df.columns else False) #bool
+
+
 class encrypt:
   
     def __init__(self, dictionary=None, opt_df=None, parent=None): 
@@ -27,9 +157,16 @@ class encrypt:
 
         # Unpack the data frame. While these could be default values, we want them
         # explicitly set in the test cases
-        self.key = opt_df['KEY'][0] if 'KEY' in opt_df.columns else 'SECRET'
-        self.output_format = opt_df['OUTPUT_FORMAT'][0] if 'OUTPUT_FORMAT' in opt_df.columns else 'HEX'
-        self.show_steps = opt_df['SHOW_STEPS'][0] if 'SHOW_STEPS' in opt_df.columns else False #bool
+        # (an RC4Options object can be passed instead of the data frame)
+        options = opt_df if isinstance(opt_df, RC4Options) else RC4Options.from_dataframe(opt_df)
+        self.key = options.key
+        self.output_format = options.output_format
+        self.show_steps = options.show_steps
+        # Optional: use the constant time PRGA (much slower, see rc4_prga_xor_constant_time)
+        self.side_channel_safe = options.side_channel_safe
+        # Optional: remember quiet path results for repeated (key, message) pairs.
+        # The cache belongs to this instance and goes away with it
+        self.result_cache = lru_cache(maxsize=CACHE_MAX_ENTRIES)(rc4_encrypt_result) if options.cache_results else None
 
         # RC4 internal state
         self.S = None  # S-box (substitution box)
@@ -37,12 +174,20 @@ class encrypt:
         self.j = 0     # Second index pointer
         self.initialized = False # an extra check for resets
 
+        # S-box right after the KSA for the last key used in the quiet path, so
+        # encrypting more messages with the same key doesn't redo the KSA
+        self.cached_key_bytes = None
+        self.cached_S = None
+
+        # Output buffer for the quiet path, reused (and grown when needed) across
+        # encrypt_message() calls instead of a new one for every message
+        self.output_buffer = bytearray()
 
 
     def prepare_key(self, key_string):
         # Convert the string to BYTES
         if isinstance(key_string, str):
-            return key_string.encode('utf-8')
+            return encode_key(key_string)
         else:
             return key_string
 
@@ -69,16 +214,26 @@ class encrypt:
             print(f"Initial S-box: [0, 1, 2, ..., 255]")
         
         # Step 2: Use key to scramble S-box
+        # (& 0xFF is the same as % 256 for these non-negative values, and a bit cheaper)
+        # The first few iterations are printed when showing steps. They're split off
+        # into their own loop so the rest don't check show_steps every time
+        S = self.S
+        expanded_key = expand_key(key_bytes)
+        shown = 8 if self.show_steps else 0
+        
         j = 0
-        for i in range(256):
-            j = (j + self.S[i] + key_bytes[i % len(key_bytes)]) % 256
+        for i in range(shown):  # Show first few iterations
+            j = (j + S[i] + expanded_key[i]) & 0xFF
+            S[i], S[j] = S[j], S[i]
             
-            # Swap S[i] and S[j]
-            self.S[i], self.S[j] = self.S[j], self.S[i]
+            key_byte = expanded_key[i]
+            print(f"i={i:3d}: j=({j-key_byte}+{S[j]}+{key_byte})%256={j:3d}, swap S[{i}]↔S[{j}]")
+        
+        for i in range(shown, 256):
+            j = (j + S[i] + expanded_key[i]) & 0xFF
             
-            if self.show_steps and i < 8:  # Show first few iterations
-                key_byte = key_bytes[i % len(key_bytes)]
-                print(f"i={i:3d}: j=({j-key_byte}+{self.S[j]}+{key_byte})%256={j:3d}, swap S[{i}]↔S[{j}]")
+            # Swap S[i] and S[j]
+            S[i], S[j] = S[j], S[i]
         
         if self.show_steps:
             print(f"Final S-box first 16 values: {self.S[:16]}")
@@ -102,16 +257,16 @@ class encrypt:
             raise ValueError("RC4 not initialized - call initialize_rc4() first")
         
         # Increment i (pointer)
-        self.i = (self.i + 1) % 256
+        self.i = (self.i + 1) & 0xFF
         
         # Update j (pointer)
-        self.j = (self.j + self.S[self.i]) % 256
+        self.j = (self.j + self.S[self.i]) & 0xFF
         
         # Swap S[i] and S[j]
         self.S[self.i], self.S[self.j] = self.S[self.j], self.S[self.i]
         
         # Generate keystream byte
-        keystream_byte = self.S[(self.S[self.i] + self.S[self.j]) % 256]
+        keystream_byte = self.S[(self.S[self.i] + self.S[self.j]) & 0xFF]
         
         return keystream_byte
     
@@ -125,7 +280,7 @@ class encrypt:
         if not self.initialized:
             self.initialize_rc4()
         
-        keystream = []
+        keystream = bytearray(length)  # filled in below, one byte per step
         
         if self.show_steps:
             print(f"\n=== RC4 Pseudo-Random Generation Algorithm (PRGA) ===")
@@ -133,19 +288,31 @@ class encrypt:
             print("Step | i   | j   | S[i] | S[j] | S[i]+S[j] | S[sum] | Keystream")
             print("-" * 65)
         
-        for step in range(length):
-            old_i, old_j = self.i, self.j # check this if it looks like something
-                                        # isn't re-writing. Might need a DEEPCOPY so 
-                                        # these aren't shaing pointers to the mem 
-                                        # address and getting rewritten at the wrong time
-            old_si = self.S[(self.i + 1) % 256]
+        # Same steps as generate_keystream_byte(), but run in this loop with the
+        # S-box and pointers held in local variables instead of a method call per byte.
+        # Printed steps get their own loop, so the rest don't check show_steps
+        S = self.S
+        i, j = self.i, self.j
+        shown = min(length, 10) if self.show_steps else 0
+        
+        for step in range(shown):  # Show first 10 steps
+            i = (i + 1) & 0xFF
+            j = (j + S[i]) & 0xFF
+            S[i], S[j] = S[j], S[i]
+            keystream_byte = S[(S[i] + S[j]) & 0xFF]
+            keystream[step] = keystream_byte
             
-            keystream_byte = self.generate_keystream_byte()
-            keystream.append(keystream_byte)
-            
-            if self.show_steps and step < 10:  # Show first 10 steps
-                sum_indices = (self.S[self.i] + self.S[self.j]) % 256
-                print(f"{step:4d} | {self.i:3d} | {self.j:3d} | {self.S[self.i]:3d}  | {self.S[self.j]:3d}  | {sum_indices:8d} | {keystream_byte:3d}    | 0x{keystream_byte:02X}")
+            sum_indices = (S[i] + S[j]) & 0xFF
+            print(f"{step:4d} | {i:3d} | {j:3d} | {S[i]:3d}  | {S[j]:3d}  | {sum_indices:8d} | {keystream_byte:3d}    | 0x{keystream_byte:02X}")
+        
+        for step in range(shown, length):
+            i = (i + 1) & 0xFF
+            j = (j + S[i]) & 0xFF
+            S[i], S[j] = S[j], S[i]
+            keystream[step] = S[(S[i] + S[j]) & 0xFF]
+        
+        # save the pointers so the stream can be continued
+        self.i, self.j = i, j
         
         if self.show_steps and length > 10:
             print(f"... (generated {length - 10} more bytes)")
@@ -163,12 +330,46 @@ class encrypt:
             plaintext_bytes = text.encode('utf-8')
         else:
             plaintext_bytes = text
-        
+
+        # Pick the path once here, so neither one checks show_steps as it goes
         if self.show_steps:
-            print(f"\n=== RC4 Encryption Process ===")
-            print(f"Plaintext: '{text}'")
-            print(f"Plaintext bytes: {plaintext_bytes.hex().upper()}")
-            print(f"Length: {len(plaintext_bytes)} bytes")
+            return self.encrypt_verbose(text, plaintext_bytes, actual_key)
+        return self.encrypt_fast(plaintext_bytes, actual_key)
+
+
+
+    def encrypt_fast(self, plaintext_bytes, actual_key):
+        # Nothing to print, so KSA and PRGA + XOR run in the module level
+        # functions above, without the show_steps checks and attribute lookups
+        key_bytes = self.prepare_key(actual_key)
+        
+        if (self.result_cache is not None and not self.side_channel_safe
+                and len(plaintext_bytes) <= CACHE_MAX_LENGTH):
+            ciphertext, S, self.i, self.j = self.result_cache(bytes(key_bytes), bytes(plaintext_bytes))
+            self.S = list(S)
+            self.initialized = True
+            return self.format_output(ciphertext)
+        
+        # Otherwise only the S-box after the KSA is reused
+        if key_bytes != self.cached_key_bytes:
+            self.cached_key_bytes = bytes(key_bytes)
+            self.cached_S = bytes(rc4_ksa(key_bytes))
+        self.S = list(self.cached_S)  # PRGA swaps in place, the cached copy stays as is
+        self.initialized = True
+        if len(self.output_buffer) < len(plaintext_bytes):
+            self.output_buffer.extend(bytes(len(plaintext_bytes) - len(self.output_buffer)))
+        prga_xor = rc4_prga_xor_constant_time if self.side_channel_safe else rc4_prga_xor
+        ciphertext, self.i, self.j = prga_xor(self.S, 0, 0, plaintext_bytes, self.output_buffer)
+        return self.format_output(ciphertext)
+
+
+
+    def encrypt_verbose(self, text, plaintext_bytes, actual_key):
+        # The step by step version, printing every stage of the process
+        print(f"\n=== RC4 Encryption Process ===")
+        print(f"Plaintext: '{text}'")
+        print(f"Plaintext bytes: {plaintext_bytes.hex().upper()}")
+        print(f"Length: {len(plaintext_bytes)} bytes")
         
         # Initialize RC4 with the key
         self.initialize_rc4(actual_key)
@@ -176,24 +377,22 @@ class encrypt:
         # Generate keystream
         keystream = self.generate_keystream(len(plaintext_bytes))
         
-        if self.show_steps:
-            print(f"\nKeystream: {keystream.hex().upper()}")
+        print(f"\nKeystream: {keystream.hex().upper()}")
         
         # XOR plaintext with keystream
-        ciphertext = bytes(p ^ k for p, k in zip(plaintext_bytes, keystream))
+        ciphertext = xor_bytes(plaintext_bytes, keystream)
         
-        if self.show_steps:
-            print(f"\n=== XOR Operation ===")
-            print("Pos | Plain | Key | Cipher")
-            print("-" * 25)
-            for i in range(min(16, len(plaintext_bytes))):  # Show first 16 bytes
-                p, k, c = plaintext_bytes[i], keystream[i], ciphertext[i]
-                print(f"{i:3d} | 0x{p:02X}  | 0x{k:02X} | 0x{c:02X}")
-            
-            if len(plaintext_bytes) > 16:
-                print(f"... ({len(plaintext_bytes) - 16} more bytes)")
-            
-            print(f"\nCiphertext bytes: {ciphertext.hex().upper()}")
+        print(f"\n=== XOR Operation ===")
+        print("Pos | Plain | Key | Cipher")
+        print("-" * 25)
+        for i in range(min(16, len(plaintext_bytes))):  # Show first 16 bytes
+            p, k, c = plaintext_bytes[i], keystream[i], ciphertext[i]
+            print(f"{i:3d} | 0x{p:02X}  | 0x{k:02X} | 0x{c:02X}")
+        
+        if len(plaintext_bytes) > 16:
+            print(f"... ({len(plaintext_bytes) - 16} more bytes)")
+        
+        print(f"\nCiphertext bytes: {ciphertext.hex().upper()}")
         
         # Format output
         return self.format_output(ciphertext)
@@ -204,6 +403,8 @@ class encrypt:
         # When asked for ways to clean up some of the functions,
         # Claude AI suggested adding other formats. Seemed fun, left it in.
 
+        # (HEX stays as .hex().upper(), both run in C and that's much faster
+        # than joining per byte strings from a lookup table)
         if self.output_format == 'HEX':
             return ciphertext_bytes.hex().upper()
         elif self.output_format == 'BASE64':
@@ -214,12 +415,20 @@ class encrypt:
         elif self.output_format == 'DECIMAL':
             return ' '.join(str(b) for b in ciphertext_bytes)
         elif self.output_format == 'BINARY':
-            return ' '.join(f'{b:08b}' for b in ciphertext_bytes)
+            return ' '.join(map(BINARY_STRINGS.__getitem__, ciphertext_bytes))
         else:
             # Default to hex
             return ciphertext_bytes.hex().upper()
 
 
+    def clear_cache(self):
+        # forget the results saved with CACHE_RESULTS on, and the S-box saved for the last key
+        if self.result_cache is not None:
+            self.result_cache.cache_clear()
+        self.cached_key_bytes = None
+        self.cached_S = None
+
+
     def show_rc4_state(self):
         # preview of what's currently happening inside the cipher process
         # This is for DEMO purposes only.
@@ -18,18 +18,40 @@
 #   Last update: June 25, 2025
 ##--------------------------------------------------------------------\
 
-import pandas as pd
+import io
+import os
+import sys
+import traceback
+import numpy as np
 from collections import Counter
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+
+# Import the real RC4 implementation (the batched KSA and PRGA the brute force uses)
+from decrypt import rc4_ksa_batch, rc4_keystream_batch
+
+np.seterr(all='raise')
+
+# Keys are run through the KSA this many at a time, so the S-box work array stays small.
+# The batches don't depend on each other either, but they aren't spread over CPUs:
+# run_comprehensive_analysis() already keeps every CPU busy with a test case each
+BATCH_SIZE = 4096
+
+# Display strings for every byte value, looked up by the analysis printouts
+HEX_STRINGS = tuple(f'{b:02X}' for b in range(256))
+# the character itself if it's printable, otherwise '?' or an escape like \x1f
+CHAR_OR_QUESTION = tuple(chr(b) if 32 <= b <= 126 else '?' for b in range(256))
+CHAR_OR_ESCAPE = tuple(chr(b) if 32 <= b <= 126 else f'\\x{b:02x}' for b in range(256))
 
-# Import the real RC4 implementation
-from encrypt import encrypt
 
 class KleinDemo:
 
-    def __init__(self):
+    def __init__(self, debug=True):
         # Does not follow the typical decrypt class format because this is a 1-off demo
 
-        self.debug = True
+        # The detailed per position/per byte printouts. These can be thousands of lines
+        # per test case, so they're collected and printed in one go, or skipped when False
+        self.debug = debug
 
 
         
@@ -43,96 +65,110 @@ class KleinDemo:
         print(f"🔑 Generating {num_samples} keystreams from related keys")
         print(f"   Base key: '{base_key}' - analyzing correlations with variations")
         
-        keystreams = []
-        keys_used = []
-        s_boxes = []
-        
-        #  opt_df structure for the encrypt() class call
-        # this is a standardization for this repo.
-        # We are using the encrypt() class due to the sheer amount of data that needs to be generated.
-        options = pd.DataFrame({
-            'KEY': [''],  # Will be set for each iteration
-            'OUTPUT_FORMAT': ['BYTES'],
-            'SHOW_STEPS': [False]
-        })
-        
-        for i in range(num_samples):
-            # Generate related key - Klein's attack often uses keys that differ in known ways
-            if i == 0:
-                # First keystream uses the exact target key
-                current_key = base_key
-            else:
-                # Generate variations of the key for statistical analysis
-                # Klein's attack exploits the fact that similar keys produce correlated outputs
-                current_key = self.generate_key_variant(base_key, i)
+        # The keystreams come straight from RC4 (the same KSA the encrypt() class uses),
+        # without a cipher instance (and opt_df) for every one of the samples.
+        # Each batch of keys goes through the KSA and PRGA together, and the batch of
+        # keystreams is only used to update the counts below before the next batch
+        # replaces it. Every analysis step only needs how often each byte value shows
+        # up at each keystream position, so the full keystreams (and keys) are never kept around
+        
+        # byte_counts[pos][value]: number of keystreams with that byte value at that position
+        byte_counts = np.zeros((keystream_length, 256), dtype=np.int64)
+        # byte_first_seen[pos][value]: the first keystream with that value at that position
+        # (keeps ties in the same order as counting through the keystreams one by one)
+        byte_first_seen = np.full((keystream_length, 256), num_samples, dtype=np.int64)
+        # The keys are built and run through RC4 as raw bytes
+        base_bytes = base_key.encode('utf-8')
+        # row offsets so one bincount can count every position at once
+        position_offsets = (np.arange(keystream_length) * 256).reshape(-1, 1)
+        
+        for start in range(0, num_samples, BATCH_SIZE):
+            end = min(start + BATCH_SIZE, num_samples)
             
-            keys_used.append(current_key)
+            # Generate related keys - Klein's attack often uses keys that differ in known ways
+            # First keystream uses the exact target key, the rest are variations of it
+            # for statistical analysis (Klein's attack exploits the fact that similar
+            # keys produce correlated outputs)
+            key_table = self.generate_key_variant_table(base_bytes, np.arange(start, end))
             
-            # Create cipher instance
-            cipher = encrypt(None, options)
+            # Initialize RC4 to get the S-boxes after KSA
+            # (every variant gets its own full KSA. A prefix or suffix changes the repeated
+            # key at almost every one of the 256 steps, so continuing from the base key's
+            # S-box would give keystreams that aren't RC4 of that key, and the analysis
+            # below would no longer be measuring RC4)
+            S = rc4_ksa_batch(key_table)
             
-            # Initialize RC4 to get the S-box after KSA
-            initial_s_box = cipher.initialize_rc4(current_key)
-            s_boxes.append(initial_s_box.copy())
+            # Generate keystreams
+            keystream_batch = rc4_keystream_batch(S, keystream_length)
             
-            # Generate keystream
-            keystream_bytes = cipher.generate_keystream(keystream_length)
-            keystream = list(keystream_bytes)
-            keystreams.append(keystream)
+            counts = np.bincount((keystream_batch + position_offsets).ravel(), minlength=keystream_length * 256)
+            byte_counts += counts.reshape(keystream_length, 256)
             
-            if (i + 1) % 1000 == 0:
-                print(f"  Generated {i + 1}/{num_samples} keystreams")
+            for pos in range(keystream_length):
+                if (byte_first_seen[pos] == num_samples).any():  # all 256 values show up quickly
+                    values, first_index = np.unique(keystream_batch[pos], return_index=True)
+                    byte_first_seen[pos, values] = np.minimum(byte_first_seen[pos, values], first_index + start)
+            
+            for done in range(start // 1000 + 1, end // 1000 + 1):
+                print(f"  Generated {done * 1000}/{num_samples} keystreams")
+        
+        keystream_stats = {
+            'samples': num_samples,
+            'byte_counts': byte_counts,  # (keystream_length, 256) arrays
+            'byte_first_seen': byte_first_seen,
+        }
         
-        return keystreams, s_boxes, keys_used
+        return keystream_stats
     
 
 
-    def generate_key_variant(self, base_key, variant_id):
-        # Generate a KEY VARIANT
+    def generate_key_variant_table(self, base_key, variant_ids):
+        # Generate KEY VARIANTS
         # Since we have control over the data source, we can adjust the key and watch 
         # how the cipherstream changes (mathematically)
-
-
-        # Convert base key to bytes
-        base_bytes = list(base_key.encode('utf-8'))
+        # One variant for every id in variant_ids, with id 0 being the base key itself.
+        # Works on the raw key bytes, so byte changes that aren't valid UTF-8 stay as
+        # they are. Each variant is built as a row of a byte matrix with numpy masks
+        # for the 4 variant types, then repeated out to 256 bytes.
+        # Returns a (256, number of ids) uint8 array, the rc4_ksa_batch() key table.
+        # The base key can't be empty (same as rc4_process_batch() in decrypt.py)
+
+        base = np.frombuffer(base_key, dtype=np.uint8)
+        key_len = len(base)
+        if key_len == 0:
+            raise ValueError("The base key can't be empty")
+        variant_ids = np.asarray(variant_ids, dtype=np.intp)
+        variant_type = variant_ids % 4
+        rows = np.arange(len(variant_ids))
+        
+        # One row per variant, room for one extra byte (the prefix/suffix variants)
+        keys = np.zeros((len(variant_ids), key_len + 1), dtype=np.uint8)
+        keys[:, :key_len] = base
+        key_lens = np.full(len(variant_ids), key_len)
         
-        # Create variants by:
         # 1. Changing one byte at a time
-        # 2. Adding random prefixes/suffixes  
-        # 3. Bit-flipping operations
-        
-        variant_type = variant_id % 4
-        
-        if variant_type == 0:
-            # Single byte modification
-            if len(base_bytes) > 0:
-                pos = variant_id % len(base_bytes)
-                modified_bytes = base_bytes.copy()
-                modified_bytes[pos] = (modified_bytes[pos] + 1) % 256
-                return bytes(modified_bytes).decode('utf-8', errors='replace')
-        
-        elif variant_type == 1:
-            # Add single byte prefix
-            prefix_byte = (variant_id // 4) % 256
-            return chr(prefix_byte) + base_key
-        
-        elif variant_type == 2:
-            # Add single byte suffix
-            suffix_byte = (variant_id // 4) % 256
-            return base_key + chr(suffix_byte)
-        
-        else:
-            # Bit flip in first byte
-            if len(base_bytes) > 0:
-                modified_bytes = base_bytes.copy()
-                bit_pos = variant_id % 8
-                modified_bytes[0] = modified_bytes[0] ^ (1 << bit_pos)
-                return bytes(modified_bytes).decode('utf-8', errors='replace')
-        
-        # Fallback
-        return base_key + chr((variant_id % 26) + ord('A'))
+        changed = (variant_type == 0) & (variant_ids != 0)
+        pos = variant_ids[changed] % key_len
+        keys[rows[changed], pos] = base[pos] + np.uint8(1)  # wraps around at 256
+        
+        # 2. Adding single byte prefixes/suffixes
+        extra_byte = (variant_ids // 4) % 256
+        prefixed = variant_type == 1
+        keys[prefixed, 1:] = base
+        keys[prefixed, 0] = extra_byte[prefixed]
+        suffixed = variant_type == 2
+        keys[suffixed, key_len] = extra_byte[suffixed]
+        key_lens[prefixed | suffixed] = key_len + 1
+        
+        # 3. Bit flip in first byte
+        flipped = variant_type == 3
+        keys[flipped, 0] = base[0] ^ (1 << (variant_ids[flipped] % 8))
+        
+        # Repeat each key out to 256 bytes, one column per key
+        key_positions = np.arange(256).reshape(-1, 1) % key_lens
+        return keys[rows, key_positions]
     
-    def analyze_klein_correlations(self, keystreams, keys_used, target_key):
+    def analyze_klein_correlations(self, keystream_stats, target_bytes):
         # This is the main part of the attack. Klein's core discovery was that the
         # first ~16 to 32 bytes have a statistically signifigant coorelation to the 
         # key bytes. 
@@ -141,34 +177,43 @@ class KleinDemo:
         print(f"\n🔍 ANALYZING KLEIN'S KEY-KEYSTREAM CORRELATIONS")
         print("-" * 50)
         
-        target_bytes = target_key.encode('utf-8')
         correlations = {}
         
         # Klein's insight: First ~16 to 32 keystream bytes have statistical correlations with key
         # This can be 16 and still get some values back (see README RC4 example), but its more interesting to run
         # the full thing.
-        for ks_pos in range(min(32, len(keystreams[0]))):
-            print(f"\nAnalyzing keystream position {ks_pos}:")
-            
-            # Extract all values at this keystream position
-            ks_values = [ks[ks_pos] for ks in keystreams]
+        # byte_counts[ks_pos][value] is how many keystreams have that value at ks_pos
+        # (counted while the keystreams were generated)
+        byte_counts = keystream_stats['byte_counts']
+        total = keystream_stats['samples']
+        analyzed_positions = min(32, byte_counts.shape[0])
+        
+        # Everything below only prints, so it's skipped with debug off.
+        # The lines are collected and printed in one go at the end
+        details = []
+        if self.debug:
+            for ks_pos in range(analyzed_positions):
+                details.append(f"\nAnalyzing keystream position {ks_pos}:")
+                position_counts = byte_counts[ks_pos].tolist()  # plain ints for the math and printing
             
-            # Klein's method: Look for bias toward specific key bytes
-            for key_pos in range(len(target_bytes)):
-                target_key_byte = target_bytes[key_pos]
+                # Klein's method: Look for bias toward specific key bytes
+                for key_pos in range(len(target_bytes)):
+                    target_key_byte = target_bytes[key_pos]
                 
-                # Count how often this key byte appears in this keystream position
-                matches = sum(1 for val in ks_values if val == target_key_byte)
-                total = len(ks_values)
-                observed_prob = matches / total
-                expected_prob = 1.0 / 256  # Random chance
+                    # How often this key byte appears in this keystream position
+                    matches = position_counts[target_key_byte]
+                    observed_prob = matches / total
+                    expected_prob = 1.0 / 256  # Random chance
                 
-                bias_strength = observed_prob / expected_prob
+                    bias_strength = observed_prob / expected_prob
                 
-                # Show all correlations, even weak ones, for debugging
-                if matches > 0:
-                    print(f"    Key[{key_pos}] = 0x{target_key_byte:02X} ('{chr(target_key_byte) if 32 <= target_key_byte <= 126 else '?'}') "
-                          f"appears {matches}/{total} times (prob: {observed_prob:.4f}, bias: {bias_strength:.2f}x)")
+                    # Show all correlations, even weak ones, for debugging
+                    if matches > 0:
+                        details.append(f"    Key[{key_pos}] = 0x{HEX_STRINGS[target_key_byte]} ('{CHAR_OR_QUESTION[target_key_byte]}') "
+                                       f"appears {matches}/{total} times (prob: {observed_prob:.4f}, bias: {bias_strength:.2f}x)")
+        
+        if details:
+            print('\n'.join(details))
         
         if correlations:
             print(f"\n🔗 Found {sum(len(v) for v in correlations.values())} significant correlations")
@@ -177,7 +222,7 @@ class KleinDemo:
         
         return correlations
     
-    def klein_key_recovery(self, keystreams, correlations, target_key_length):
+    def klein_key_recovery(self, keystream_stats, correlations, target_key_length):
         # The key recovery using the discovered correlations.
         # Most of the time this is going to get NOTHING with our demos. 
         # This implementation is not intelligent enough to modify the tested keys based on 
@@ -191,65 +236,66 @@ class KleinDemo:
         recovered_key = []
         confidence_scores = []
         
+        # Secondary scoring: frequency analysis of each candidate in the keystreams
+        # (how often each byte value shows up in the first 8 bytes of all of them).
+        # This doesn't depend on the key position, so it's worked out once for all 256 candidates
+        # But weight this much lower than direct correlations
+        first_bytes_counts = keystream_stats['byte_counts'][:8]
+        first_bytes_total = keystream_stats['samples'] * len(first_bytes_counts)
+        freq_scores = (first_bytes_counts.sum(axis=0) / first_bytes_total) * 10  # Lower weight
+        
+        details = []  # printed all at once at the end (only with debug on)
+        
         for key_pos in range(target_key_length):
-            print(f"\n🎯 Recovering key byte {key_pos}:")
             
-            candidate_scores = {}
+            # Score for every possible byte value (the index is the candidate byte)
+            candidate_scores = np.zeros(256)
             
-            # For each possible byte value
-            for candidate in range(256):
-                score = 0
-                
-                # Check all keystream positions for correlations with this candidate
-                for ks_pos, ks_correlations in correlations.items():
-                    if key_pos in ks_correlations:
-                        correlation = ks_correlations[key_pos]
-                        
-                        # If this candidate matches the correlated key byte, give massive score
-                        if candidate == correlation['key_byte']:
-                            # Weight by bias strength - strong correlations get huge scores
-                            correlation_score = correlation['bias_strength'] * 1000
-                            score += correlation_score
-                
-                # Secondary scoring: frequency analysis of candidate in keystreams
-                # But weight this much lower than direct correlations
-                all_ks_values = [val for ks in keystreams for val in ks[:8]]  # First 8 bytes
-                candidate_freq = sum(1 for val in all_ks_values if val == candidate)
-                freq_score = (candidate_freq / len(all_ks_values)) * 10  # Lower weight
-                score += freq_score
-                
-                candidate_scores[candidate] = score
+            # Check all keystream positions for correlations with this key position
+            for ks_pos, ks_correlations in correlations.items():
+                if key_pos in ks_correlations:
+                    correlation = ks_correlations[key_pos]
+                    
+                    # The candidate that matches the correlated key byte gets a massive score
+                    # Weight by bias strength - strong correlations get huge scores
+                    candidate_scores[correlation['key_byte']] += correlation['bias_strength'] * 1000
+            
+            candidate_scores += freq_scores
             
             # Find best candidate
-            if candidate_scores:
-                sorted_candidates = sorted(candidate_scores.items(), key=lambda x: x[1], reverse=True)
-                
-                best_candidate = sorted_candidates[0][0]
-                best_score = sorted_candidates[0][1]
-                second_best_score = sorted_candidates[1][1] if len(sorted_candidates) > 1 else 0
-                
-                confidence = best_score - second_best_score
-                
-                recovered_key.append(best_candidate)
-                confidence_scores.append(confidence)
-                
-                # Show top candidates
-                print(f"  Top candidates:")
+            # Only the top 5 are used, so only the candidates scoring at least the 5th best
+            # score get sorted (a stable sort, so equal scores stay in candidate order like before)
+            fifth_best = np.partition(candidate_scores, -5)[-5]
+            top = np.flatnonzero(candidate_scores >= fifth_best)
+            ranked = top[np.argsort(-candidate_scores[top], kind='stable')][:5]
+            sorted_candidates = list(zip(ranked.tolist(), candidate_scores[ranked].tolist()))
+            
+            best_candidate = sorted_candidates[0][0]
+            best_score = sorted_candidates[0][1]
+            second_best_score = sorted_candidates[1][1]
+            
+            confidence = best_score - second_best_score
+            
+            recovered_key.append(best_candidate)
+            confidence_scores.append(confidence)
+            
+            # Show top candidates
+            if self.debug:
+                details.append(f"\n🎯 Recovering key byte {key_pos}:")
+                details.append(f"  Top candidates:")
                 for i, (byte_val, score) in enumerate(sorted_candidates[:5]):
-                    char_rep = chr(byte_val) if 32 <= byte_val <= 126 else f'\\x{byte_val:02x}'
-                    print(f"    {i+1}. 0x{byte_val:02X} ('{char_rep}') - score: {score:.3f}")
+                    details.append(f"    {i+1}. 0x{HEX_STRINGS[byte_val]} ('{CHAR_OR_ESCAPE[byte_val]}') - score: {score:.3f}")
                 
-                print(f"  → Selected: 0x{best_candidate:02X}, confidence: {confidence:.3f}")
-            else:
-                recovered_key.append(0)
-                confidence_scores.append(0)
-                print(f"  → No clear candidate found")
+                details.append(f"  → Selected: 0x{best_candidate:02X}, confidence: {confidence:.3f}")
+        
+        if details:
+            print('\n'.join(details))
         
         return recovered_key, confidence_scores
     
 
     
-    def analyze_first_bytes_bias(self, keystreams):
+    def analyze_first_bytes_bias(self, keystream_stats):
         # This was a Claude AI suggestion
         # Pulling this analysis out to a different function because these
         # first couple bytes are far more signifigant that some sources state
@@ -259,13 +305,15 @@ class KleinDemo:
         print(f"\n🔍 ANALYZING FIRST BYTES BIAS (RC4 Weakness)")
         print("-" * 50)
         
+        byte_counts = keystream_stats['byte_counts']
+        total = keystream_stats['samples']
+        
         # Check if byte 0 = 0 is more likely (known RC4 bias)
-        first_bytes = [ks[0] for ks in keystreams]
-        zero_count = sum(1 for b in first_bytes if b == 0)
-        zero_prob = zero_count / len(first_bytes)
+        zero_count = int(byte_counts[0, 0])
+        zero_prob = zero_count / total
         expected_prob = 1.0 / 256
         
-        print(f"First byte = 0: {zero_count}/{len(first_bytes)} ({zero_prob:.4f})")
+        print(f"First byte = 0: {zero_count}/{total} ({zero_prob:.4f})")
         print(f"Expected probability: {expected_prob:.4f}")
         
         if zero_prob > expected_prob * 1.5:
@@ -274,27 +322,34 @@ class KleinDemo:
             print(f"❌ No significant first-byte bias detected")
         
         # Check second byte biases
-        if len(keystreams[0]) > 1:
-            second_bytes = [ks[1] for ks in keystreams]
-            second_counter = Counter(second_bytes)
-            most_common = second_counter.most_common(5)
+        second_counter = {}
+        if byte_counts.shape[0] > 1:
+            second_counts = byte_counts[1]
+            second_list = second_counts.tolist()
+            
+            # Top 5 by count, with ties in the order the values first show up
+            # (the same order Counter.most_common() gives counting them one by one)
+            first_seen = keystream_stats['byte_first_seen'][1]
+            ranked = np.lexsort((first_seen, -second_counts))[:5]
+            most_common = [(value, second_list[value]) for value in ranked.tolist() if second_list[value] > 0]
+            second_counter = Counter({value: count for value, count in enumerate(second_list) if count > 0})
             
             print(f"\nSecond byte distribution (top 5):")
             for byte_val, count in most_common:
-                prob = count / len(second_bytes)
+                prob = count / total
                 bias = prob / expected_prob
-                print(f"  0x{byte_val:02X}: {count}/{len(second_bytes)} ({prob:.4f}, bias: {bias:.2f}x)")
+                print(f"  0x{byte_val:02X}: {count}/{total} ({prob:.4f}, bias: {bias:.2f}x)")
         
         return {
             'first_byte_zero_prob': zero_prob,
             'first_byte_bias_factor': zero_prob / expected_prob,
-            'second_byte_dist': Counter([ks[1] for ks in keystreams]) if len(keystreams[0]) > 1 else {}
+            'second_byte_dist': second_counter
         }
 
 
 
 
-    def evaluate_attack_success(self, target_key, recovered_key, confidence_scores):
+    def evaluate_attack_success(self, target_key, target_bytes, recovered_key, confidence_scores):
         # How successful was the attack?
         # This function compares how well the recovered key matches the target key
         # Hint: Usually not well, about random.
@@ -306,29 +361,32 @@ class KleinDemo:
         print("ATTACK EVALUATION")
         print("=" * 60)
         
-        target_bytes = target_key.encode('utf-8')
-        
         print(f"Target key:    '{target_key}'")
-        print(f"Target bytes:  {' '.join(f'{b:02X}' for b in target_bytes)}")
+        print(f"Target bytes:  {' '.join(HEX_STRINGS[b] for b in target_bytes)}")
         
         # Build recovered key string
         recovered_str = ""
         recovered_hex = []
         correct_count = 0
         
+        details = []  # printed all at once below (only with debug on)
+        
         for i, (recovered_byte, confidence) in enumerate(zip(recovered_key, confidence_scores)):
             if i < len(target_bytes):
                 correct = recovered_byte == target_bytes[i]
                 if correct:
                     correct_count += 1
                 
-                char_rep = chr(recovered_byte) if 32 <= recovered_byte <= 126 else f'\\x{recovered_byte:02x}'
-                recovered_str += char_rep
-                recovered_hex.append(f"{recovered_byte:02X}")
+                recovered_str += CHAR_OR_ESCAPE[recovered_byte]
+                recovered_hex.append(HEX_STRINGS[recovered_byte])
                 
                 status = "✅" if correct else "❌"
-                print(f"Position {i}: 0x{recovered_byte:02X} vs 0x{target_bytes[i]:02X} "
-                      f"(conf: {confidence:.3f}) {status}")
+                if self.debug:
+                    details.append(f"Position {i}: 0x{HEX_STRINGS[recovered_byte]} vs 0x{HEX_STRINGS[target_bytes[i]]} "
+                                   f"(conf: {confidence:.3f}) {status}")
+        
+        if details:
+            print('\n'.join(details))
         
         print(f"\nRecovered key: '{recovered_str}'")
         print(f"Recovered hex: {' '.join(recovered_hex)}")
@@ -350,22 +408,24 @@ class KleinDemo:
         
         # Step 1: Generate related keystreams
         print(f"🎯 TARGET KEY: '{target_key}' ({len(target_key)} bytes)")
-        keystreams, s_boxes, keys_used = self.generate_related_keystreams(target_key, num_samples)
+        # Key bytes for the analysis steps, encoded once here
+        target_bytes = target_key.encode('utf-8')
+        keystream_stats = self.generate_related_keystreams(target_key, num_samples)
         
         # Step 2: Analyze Klein's correlations
-        correlations = self.analyze_klein_correlations(keystreams, keys_used, target_key)
+        correlations = self.analyze_klein_correlations(keystream_stats, target_bytes)
         
         # Step 3: Analyze first bytes bias (RC4 weakness)
-        first_byte_analysis = self.analyze_first_bytes_bias(keystreams)
+        first_byte_analysis = self.analyze_first_bytes_bias(keystream_stats)
         
         # Step 4: Attempt key recovery
-        recovered_key, confidence_scores = self.klein_key_recovery(keystreams, correlations, len(target_key))
+        recovered_key, confidence_scores = self.klein_key_recovery(keystream_stats, correlations, len(target_key))
         
         # Step 5: Evaluate success
-        success_rate = self.evaluate_attack_success(target_key, recovered_key, confidence_scores)
+        success_rate = self.evaluate_attack_success(target_key, target_bytes, recovered_key, confidence_scores)
         
         print(f"\n📊 ATTACK SUMMARY:")
-        print(f"• Keystreams analyzed: {len(keystreams)}")
+        print(f"• Keystreams analyzed: {keystream_stats['samples']}")
         print(f"• Correlations found: {sum(len(v) for v in correlations.values())}")
         print(f"• First-byte bias factor: {first_byte_analysis['first_byte_bias_factor']:.2f}x")
         
@@ -404,27 +464,51 @@ def run_comprehensive_analysis():
         {"key": "DEMO2025", "samples": 200000, "description": "8-char mixed key"}
     ]
     
-    attack = KleinDemo()
+    # The test cases don't depend on each other, so they run in separate processes
+    # (up to one per CPU). Each one's printout is saved and shown in order below,
+    # so the output reads the same as running them one after the other
     results = []
+    workers = min(len(test_cases), os.cpu_count() or 1)
     
-    for i, test_case in enumerate(test_cases, 1):
-        print(f"\n{'='*80}")
-        print(f"TEST CASE {i}/{len(test_cases)}: {test_case['description']}")
-        print(f"Key: '{test_case['key']}' | Samples: {test_case['samples']}")
-        print('='*80)
-        
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_test_case, i, test_case) for i, test_case in enumerate(test_cases, 1)]
+        
+        for i, (test_case, future) in enumerate(zip(test_cases, futures), 1):
+            print(f"\n{'='*80}")
+            print(f"TEST CASE {i}/{len(test_cases)}: {test_case['description']}")
+            print(f"Key: '{test_case['key']}' | Samples: {test_case['samples']}")
+            print('='*80)
+            
+            printout, result, error_trace = future.result()
+            print(printout, end='')
+            if error_trace:
+                print(error_trace, end='', file=sys.stderr)
+            results.append(result)
+    
+    # Generate final report
+    generate_final_report(results)
+    
+    return results
+
+
+
+def run_test_case(i, test_case):
+    # One test case from run_comprehensive_analysis(), run in a worker process.
+    # Returns what it printed, the result dict and the traceback if it failed
+    printout = io.StringIO()
+    error_trace = None
+    
+    with redirect_stdout(printout):
         try:
-            result = attack.run_real_attack(test_case['key'], test_case['samples'])
+            result = KleinDemo().run_real_attack(test_case['key'], test_case['samples'])
             result['description'] = test_case['description']
-            results.append(result)
             
             print(f"\n⏱️  Test case {i} complete. Moving to next...")
             
         except Exception as e:
             print(f"❌ Test case {i} failed with error: {e}")
-            import traceback
-            traceback.print_exc()
-            results.append({
+            error_trace = traceback.format_exc()
+            result = {
                 'target_key': test_case['key'],
                 'recovered_key': [],
                 'success_rate': 0,
@@ -434,12 +518,9 @@ def run_comprehensive_analysis():
                 'confidence_scores': [],
                 'description': test_case['description'],
                 'error': str(e)
-            })
+            }
     
-    # Generate final report
-    generate_final_report(results)
-    
-    return results
+    return printout.getvalue(), result, error_trace
 
 
 
@@ -20,6 +20,31 @@ from encrypt import encrypt
 import time
 
 
+def count_byte_differences(bytes_a, bytes_b):
+    # Hamming distance in bytes: the number of positions where the two differ,
+    # over the length of the shorter one
+    # (both compared as uint8 arrays in one numpy pass)
+    length = min(len(bytes_a), len(bytes_b))
+    a = np.frombuffer(bytes_a, dtype=np.uint8, count=length)
+    b = np.frombuffer(bytes_b, dtype=np.uint8, count=length)
+    return int(np.count_nonzero(a != b))
+
+
+def sequence_groups(cipher_bytes, length):
+    # Groups the byte sequences of a given length, one starting at every position,
+    # by value (np.unique on the sliding windows, each window compared as one item).
+    # Returns (first_index, counts, inverse): the first position and the number of
+    # times for each distinct sequence, and which distinct sequence starts at each position
+    if len(cipher_bytes) < length:
+        no_groups = np.zeros(0, dtype=np.intp)
+        return no_groups, no_groups, no_groups
+    
+    windows = np.lib.stride_tricks.sliding_window_view(np.frombuffer(cipher_bytes, dtype=np.uint8), length)
+    sequences = np.ascontiguousarray(windows).view(np.dtype((np.void, length))).ravel()
+    _, first_index, inverse, counts = np.unique(sequences, return_index=True, return_inverse=True, return_counts=True)
+    return first_index, counts, inverse
+
+
 class ChaCha20Cryptanalysis:
     def __init__(self):
         self.samples = []
@@ -38,23 +63,26 @@ class ChaCha20Cryptanalysis:
             return None
             
         # Count byte frequencies
-        freq_counter = collections.Counter(cipher_bytes)
+        # (one bincount over the bytes, index = byte value)
+        byte_hist = np.bincount(np.frombuffer(cipher_bytes, dtype=np.uint8), minlength=256)
+        seen_bytes = np.flatnonzero(byte_hist)
         
         print(f"Ciphertext length: {len(cipher_bytes)} bytes")
-        print(f"Unique bytes: {len(freq_counter)}/256 possible")
+        print(f"Unique bytes: {len(seen_bytes)}/256 possible")
         
         # Calculate statistics
-        frequencies = list(freq_counter.values())
-        if frequencies:
-            mean_freq = np.mean(frequencies)
-            std_freq = np.std(frequencies)
+        # (over the byte values that show up)
+        frequencies = byte_hist[seen_bytes]
+        if len(frequencies):
+            mean_freq = frequencies.mean()
+            std_freq = frequencies.std()
             
             print(f"Mean frequency: {mean_freq:.2f}")
             print(f"Std deviation: {std_freq:.2f}")
             
             # Chi-square test for uniformity
             expected = len(cipher_bytes) / 256
-            chi_square = sum((obs - expected)**2 / expected for obs in frequencies)
+            chi_square = (((frequencies - expected)**2) / expected).sum()
             
             print(f"\nChi-square statistic: {chi_square:.2f}")
             print(f"Expected for random: ~255")
@@ -63,6 +91,9 @@ class ChaCha20Cryptanalysis:
                 print("✅ RESULT: Distribution appears random (good for ChaCha20)")
             else:
                 print("⚠️  RESULT: Non-random distribution detected!")
+        
+        # Byte value -> count, for the byte values that show up
+        freq_counter = collections.Counter(dict(zip(seen_bytes.tolist(), frequencies.tolist())))
                 
         return freq_counter
     
@@ -76,21 +107,18 @@ class ChaCha20Cryptanalysis:
         
         # Look for patterns of different lengths
         for pattern_len in [2, 3, 4, 6, 8]:
-            patterns = {}
+            first_index, counts, inverse = sequence_groups(cipher_bytes, pattern_len)
             
-            for i in range(len(cipher_bytes) - pattern_len + 1):
-                pattern = cipher_bytes[i:i+pattern_len]
-                if pattern in patterns:
-                    patterns[pattern].append(i)
-                else:
-                    patterns[pattern] = [i]
-            
-            # Find repeated patterns
-            repeated = {p: positions for p, positions in patterns.items() if len(positions) > 1}
+            # Find repeated patterns, in the order they first show up
+            repeated = np.flatnonzero(counts > 1)
+            repeated = repeated[np.argsort(first_index[repeated])]
             
-            if repeated:
+            if len(repeated):
                 print(f"Patterns of length {pattern_len}:")
-                for pattern, positions in list(repeated.items())[:5]:  # Show first 5
+                for group in repeated[:5].tolist():  # Show first 5
+                    start = int(first_index[group])
+                    pattern = cipher_bytes[start:start+pattern_len]
+                    positions = np.flatnonzero(inverse == group).tolist()
                     print(f"  {pattern.hex().upper()} at positions: {positions}")
                 patterns_found[pattern_len] = len(repeated)
             else:
@@ -113,36 +141,25 @@ class ChaCha20Cryptanalysis:
         cipher_bytes = bytes.fromhex(ciphertext_hex)
         
         # Look for repeated 3-grams and their distances
-        trigrams = {}
-        for i in range(len(cipher_bytes) - 2):
-            trigram = cipher_bytes[i:i+3]
-            if trigram in trigrams:
-                trigrams[trigram].append(i)
-            else:
-                trigrams[trigram] = [i]
+        first_index, counts, inverse = sequence_groups(cipher_bytes, 3)
         
         # Find repeated trigrams and calculate distances
-        distances = []
-        repeated_trigrams = 0
-        
-        for trigram, positions in trigrams.items():
-            if len(positions) > 1:
-                repeated_trigrams += 1
-                for i in range(len(positions) - 1):
-                    distance = positions[i+1] - positions[i]
-                    distances.append(distance)
+        # (positions sorted by trigram, so each trigram's positions are next to each
+        # other in order, and the distances are the gaps within a trigram)
+        order = np.argsort(inverse, kind='stable')
+        same_trigram = inverse[order][1:] == inverse[order][:-1]
+        distances = np.diff(order)[same_trigram]
+        repeated_trigrams = int(np.count_nonzero(counts > 1))
         
         print(f"Repeated trigrams found: {repeated_trigrams}")
         
-        if distances:
-            print(f"Distances between repeats: {sorted(distances)[:10]}")  # First 10
+        if len(distances):
+            print(f"Distances between repeats: {np.sort(distances)[:10].tolist()}")  # First 10
             
             # Look for common factors (potential key lengths)
-            from math import gcd
-            from functools import reduce
-            
+            # (np.gcd.reduce runs the whole GCD in one C loop)
             if len(distances) > 1:
-                common_gcd = reduce(gcd, distances)
+                common_gcd = int(np.gcd.reduce(distances))
                 print(f"GCD of distances: {common_gcd}")
                 
                 if common_gcd > 1:
@@ -175,18 +192,22 @@ class ChaCha20Cryptanalysis:
         results = []
         base_cipher = None
         
-        for message, description in test_cases:
-            # Encrypt each message
-            encrypt_options = pd.DataFrame({
-                'KEY': [base_key],
-                'NONCE': [base_nonce],
-                'COUNTER': [base_counter],
-                'OUTPUT_FORMAT': ['HEX'],
-                'SHOW_STEPS': [False]
-            })
-            
-            encryptor = encrypt(None, encrypt_options)
-            ciphertext = encryptor.encrypt_message(message)
+        # One encryptor for all of the messages (encrypt_message() starts
+        # from the same key, nonce, and counter every call)
+        encrypt_options = pd.DataFrame({
+            'KEY': [base_key],
+            'NONCE': [base_nonce],
+            'COUNTER': [base_counter],
+            'OUTPUT_FORMAT': ['HEX'],
+            'SHOW_STEPS': [False]
+        })
+        
+        encryptor = encrypt(None, encrypt_options)
+        
+        # Encrypt all of the messages in one batch
+        ciphertexts = encryptor.encrypt_batch([message for message, _ in test_cases])
+        
+        for (message, description), ciphertext in zip(test_cases, ciphertexts):
             
             results.append((message, ciphertext, description))
             
@@ -199,8 +220,7 @@ class ChaCha20Cryptanalysis:
                 curr_bytes = bytes.fromhex(ciphertext)
                 
                 # Calculate Hamming distance
-                min_len = min(len(base_bytes), len(curr_bytes))
-                hamming_dist = sum(a != b for a, b in zip(base_bytes[:min_len], curr_bytes[:min_len]))
+                hamming_dist = count_byte_differences(base_bytes, curr_bytes)
                 
                 if len(base_bytes) != len(curr_bytes):
                     hamming_dist += abs(len(base_bytes) - len(curr_bytes))
@@ -232,18 +252,18 @@ class ChaCha20Cryptanalysis:
         
         ciphertexts = []
         
+        encrypt_options = pd.DataFrame({
+            'KEY': [key],
+            'NONCE': [nonce],
+            'COUNTER': [counter],
+            'OUTPUT_FORMAT': ['HEX'],
+            'SHOW_STEPS': [False]
+        })
+        
+        encryptor = encrypt(None, encrypt_options)
+        
         print("Encrypting multiple messages with SAME key+nonce (BAD!):")
-        for i, msg in enumerate(messages):
-            encrypt_options = pd.DataFrame({
-                'KEY': [key],
-                'NONCE': [nonce],
-                'COUNTER': [counter],
-                'OUTPUT_FORMAT': ['HEX'],
-                'SHOW_STEPS': [False]
-            })
-            
-            encryptor = encrypt(None, encrypt_options)
-            cipher = encryptor.encrypt_message(msg)
+        for i, (msg, cipher) in enumerate(zip(messages, encryptor.encrypt_batch(messages))):
             ciphertexts.append(cipher)
             
             print(f"Message {i+1}: '{msg}'")
@@ -298,17 +318,19 @@ class ChaCha20Cryptanalysis:
         
         results = []
         
+        # One encryptor, with the key passed in for each encryption
+        encrypt_options = pd.DataFrame({
+            'KEY': [base_key],
+            'NONCE': [nonce],
+            'COUNTER': [counter],
+            'OUTPUT_FORMAT': ['HEX'],
+            'SHOW_STEPS': [False]
+        })
+        
+        encryptor = encrypt(None, encrypt_options)
+        
         for key in related_keys:
-            encrypt_options = pd.DataFrame({
-                'KEY': [key],
-                'NONCE': [nonce],
-                'COUNTER': [counter],
-                'OUTPUT_FORMAT': ['HEX'],
-                'SHOW_STEPS': [False]
-            })
-            
-            encryptor = encrypt(None, encrypt_options)
-            cipher = encryptor.encrypt_message(message)
+            cipher = encryptor.encrypt_message(message, key=key)
             results.append((key, cipher))
             
             print(f"Key: '{key}' → {cipher}")
@@ -322,7 +344,7 @@ class ChaCha20Cryptanalysis:
             cipher_bytes = bytes.fromhex(cipher)
             
             # Calculate similarity
-            differences = sum(a != b for a, b in zip(base_cipher_bytes, cipher_bytes))
+            differences = count_byte_differences(base_cipher_bytes, cipher_bytes)
             similarity = 1 - (differences / len(base_cipher_bytes))
             
             print(f"'{key}' vs base: {differences}/{len(base_cipher_bytes)} different bytes ({similarity*100:.1f}% similar)")
@@ -350,24 +372,27 @@ class ChaCha20Cryptanalysis:
         
         timing_results = []
         
+        # Set up once, so building the options and the encryptor isn't part of
+        # the run time. Only encrypt_message() is timed
+        encrypt_options = pd.DataFrame({
+            'KEY': [key_patterns[0][0]],
+            'NONCE': [nonce],
+            'COUNTER': [counter],
+            'OUTPUT_FORMAT': ['HEX'],
+            'SHOW_STEPS': [False]
+        })
+        
+        encryptor = encrypt(None, encrypt_options)
+        perf_counter = time.perf_counter
+        
         for key, description in key_patterns:
             times = []
             
             # Run multiple trials
             for trial in range(10):
-                encrypt_options = pd.DataFrame({
-                    'KEY': [key],
-                    'NONCE': [nonce],
-                    'COUNTER': [counter],
-                    'OUTPUT_FORMAT': ['HEX'],
-                    'SHOW_STEPS': [False]
-                })
-                
-                encryptor = encrypt(None, encrypt_options)
-                
-                start_time = time.perf_counter()
-                cipher = encryptor.encrypt_message(message)
-                end_time = time.perf_counter()
+                start_time = perf_counter()
+                cipher = encryptor.encrypt_message(message, key=key)
+                end_time = perf_counter()
                 
                 times.append(end_time - start_time)
             
@@ -402,13 +427,15 @@ class ChaCha20Cryptanalysis:
         cipher_bytes = bytes.fromhex(ciphertext_hex)
         
         # Calculate Shannon entropy
-        byte_counts = collections.Counter(cipher_bytes)
+        # (from the counts of the byte values that show up)
+        byte_hist = np.bincount(np.frombuffer(cipher_bytes, dtype=np.uint8), minlength=256)
+        byte_counts = byte_hist[byte_hist > 0]
         total_bytes = len(cipher_bytes)
         
         entropy = 0
-        for count in byte_counts.values():
-            probability = count / total_bytes
-            entropy -= probability * np.log2(probability)
+        if total_bytes:
+            probabilities = byte_counts / total_bytes
+            entropy -= float((probabilities * np.log2(probabilities)).sum())
         
         max_entropy = 8.0  # Maximum possible for bytes
         
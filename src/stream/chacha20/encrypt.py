@@ -365,6 +365,45 @@ class encrypt:
 
 
 
+    def encrypt_batch(self, texts, key=None, nonce=None, counter=None):
+        # Encrypt several messages with the same key, nonce, and counter
+        # (the same as calling encrypt_message() on each one).
+        # The state is set up once, and the keystream is generated once per
+        # number of blocks needed, then XORed with every message that needs that many.
+        # (The keystream depends on the number of blocks, not just the length,
+        # see generate_keystream(), so it's not just one keystream cut to size)
+
+        if self.show_steps:
+            # keep the step by step printout for every message
+            return [self.encrypt_message(text, key, nonce, counter) for text in texts]
+
+        actual_key = key if key is not None else self.key
+        actual_nonce = nonce if nonce is not None else self.nonce
+        actual_counter = counter if counter is not None else self.counter
+
+        self.initialize_chacha20(actual_key, actual_nonce, actual_counter)
+
+        keystreams = {}  # blocks needed -> keystream
+        results = []
+        for text in texts:
+            if isinstance(text, str):
+                plaintext_bytes = text.encode('utf-8')
+            else:
+                plaintext_bytes = text
+
+            blocks_needed = (len(plaintext_bytes) + 63) // 64
+            if blocks_needed not in keystreams:
+                keystreams[blocks_needed] = np.frombuffer(self.generate_keystream(blocks_needed * 64), dtype=np.uint8)
+
+            # XOR plaintext with keystream
+            plaintext_array = np.frombuffer(plaintext_bytes, dtype=np.uint8)
+            ciphertext = (plaintext_array ^ keystreams[blocks_needed][:len(plaintext_bytes)]).tobytes()
+            results.append(self.format_output(ciphertext))
+
+        return results
+
+
+
     def format_output(self, ciphertext_bytes):
         # Claude AI addition for the stream ciphers so that they can 
         # be in a few different formats instead of 1 hardcoded format